@@ -5,15 +5,16 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import gradio as gr
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, Response, stream_with_context
 import requests
 import threading
 import time
+import uuid
 
 # Import services
-from backend.services.watsonx_service import watsonx_service
-from backend.services.pinecone_service import pinecone_service
-from backend.services.google_classroom_service import google_classroom_service
+from backend.services.watsonx_service import get_watsonx_service
+from backend.services.pinecone_service import get_pinecone_service
+from backend.services.storage import get_storage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -47,8 +48,7 @@ users_db = {
     }
 }
 
-quizzes_db = {}
-attempts_db = {}
+# Quizzes and attempts are kept by backend.services.storage (SQLite by default)
 
 def hash_password(password: str) -> str:
     """Hash password using SHA256"""
@@ -169,13 +169,13 @@ def api_generate_quiz():
         logger.info(f"Generating quiz: topic={topic}, difficulty={difficulty}, questions={num_questions}")
         
         # Generate questions using IBM Granite model
-        questions_data = watsonx_service.generate_quiz_questions(
+        questions_data = get_watsonx_service().generate_quiz_questions(
             topic=topic,
             difficulty=difficulty,
             num_questions=num_questions
         )
         
-        quiz_id = f"quiz_{datetime.now().timestamp()}"
+        quiz_id = f"quiz_{uuid.uuid4().hex}"
         quiz = {
             'id': quiz_id,
             'title': f"{topic} Quiz - {difficulty.title()}",
@@ -187,7 +187,7 @@ def api_generate_quiz():
             'created_by': session['user']['id']
         }
         
-        quizzes_db[quiz_id] = quiz
+        get_storage().save_quiz(quiz)
         logger.info(f"Quiz generated successfully: {quiz_id}")
         return jsonify(quiz)
         
@@ -195,6 +195,46 @@ def api_generate_quiz():
         logger.error(f"Error generating quiz: {e}")
         return jsonify({'error': f'Failed to generate quiz: {str(e)}'}), 500
 
+@flask_app.route('/api/generate_quiz/stream', methods=['POST'])
+def api_generate_quiz_stream():
+    """Stream quiz questions as NDJSON so the page can render them as they arrive"""
+    if 'user' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    data = request.json
+    topic = data.get('topic')
+    difficulty = data.get('difficulty')
+    num_questions = data.get('num_questions', 5)
+    
+    quiz_id = f"quiz_{uuid.uuid4().hex}"
+    quiz = {
+        'id': quiz_id,
+        'title': f"{topic} Quiz - {difficulty.title()}",
+        'topic': topic,
+        'difficulty': difficulty,
+        'questions': [],
+        'time_limit': 30,
+        'created_at': datetime.now().isoformat(),
+        'created_by': session['user']['id']
+    }
+    
+    def generate():
+        yield json.dumps({'type': 'quiz', **{k: v for k, v in quiz.items() if k != 'questions'}}) + '\n'
+        try:
+            for question in get_watsonx_service().stream_quiz_questions(topic, difficulty, num_questions):
+                quiz['questions'].append(question)
+                yield json.dumps({'type': 'question', 'question': question}) + '\n'
+        except Exception as e:
+            logger.error(f"Error streaming quiz: {e}")
+            yield json.dumps({'type': 'error', 'error': f'Failed to generate quiz: {str(e)}'}) + '\n'
+            return
+        
+        get_storage().save_quiz(quiz)
+        logger.info(f"Quiz streamed successfully: {quiz_id}")
+        yield json.dumps({'type': 'done', 'quiz_id': quiz_id, 'num_questions': len(quiz['questions'])}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @flask_app.route('/api/submit_quiz', methods=['POST'])
 def api_submit_quiz():
     if 'user' not in session:
@@ -206,7 +246,7 @@ def api_submit_quiz():
     time_spent = data.get('time_spent', 0)
     
     try:
-        quiz = quizzes_db.get(quiz_id)
+        quiz = get_storage().get_quiz(quiz_id)
         if not quiz:
             return jsonify({'error': 'Quiz not found'}), 404
         
@@ -224,11 +264,13 @@ def api_submit_quiz():
         feedback = generate_feedback(score, quiz['topic'], correct_answers, total_questions)
         
         # Create attempt record
-        attempt_id = f"attempt_{datetime.now().timestamp()}"
+        attempt_id = f"attempt_{uuid.uuid4().hex}"
         attempt = {
             'id': attempt_id,
             'quiz_id': quiz_id,
             'user_id': session['user']['id'],
+            'topic': quiz['topic'],
+            'difficulty': quiz['difficulty'],
             'answers': answers,
             'score': score,
             'correct_answers': correct_answers,
@@ -238,7 +280,7 @@ def api_submit_quiz():
             'feedback': feedback
         }
         
-        attempts_db[attempt_id] = attempt
+        get_storage().save_attempt(attempt)
         
         # Store in Pinecone for adaptive learning
         quiz_data = {
@@ -248,7 +290,7 @@ def api_submit_quiz():
             'score': score,
             'timestamp': datetime.now().isoformat()
         }
-        pinecone_service.store_quiz_attempt(session['user']['id'], quiz_data)
+        get_pinecone_service().store_quiz_attempt(session['user']['id'], quiz_data)
         
         logger.info(f"Quiz submitted: {attempt_id}, Score: {score}%")
         return jsonify(attempt)
@@ -262,7 +304,7 @@ def api_quiz_history(user_id):
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
     
-    user_attempts = [attempt for attempt in attempts_db.values() if attempt['user_id'] == user_id]
+    user_attempts = get_storage().get_attempts_for_user(user_id)
     return jsonify(user_attempts)
 
 @flask_app.route('/api/student_progress')
@@ -272,14 +314,15 @@ def api_student_progress():
     
     # Get all students and their progress
     students_progress = []
+    student_stats = get_storage().get_student_stats()
     
     for email, user in users_db.items():
         if user['role'] == 'student':
-            user_attempts = [attempt for attempt in attempts_db.values() if attempt['user_id'] == user['id']]
+            stats = student_stats.get(user['id'])
             
-            if user_attempts:
-                avg_score = sum(attempt['score'] for attempt in user_attempts) / len(user_attempts)
-                last_activity = max(attempt['completed_at'] for attempt in user_attempts)
+            if stats:
+                avg_score = stats['score_sum'] / stats['attempts']
+                last_activity = stats['last_activity']
             else:
                 avg_score = 0
                 last_activity = 'Never'
@@ -288,7 +331,7 @@ def api_student_progress():
                 'user_id': user['id'],
                 'name': user['name'],
                 'email': user['email'],
-                'total_quizzes': len(user_attempts),
+                'total_quizzes': stats['attempts'] if stats else 0,
                 'average_score': round(avg_score, 1),
                 'last_activity': last_activity,
                 'created_at': user['created_at']
@@ -301,7 +344,7 @@ def api_recommendations(user_id):
     if 'user' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
     
-    recommendations = pinecone_service.get_adaptive_recommendations(user_id)
+    recommendations = get_pinecone_service().get_adaptive_recommendations(user_id)
     return jsonify(recommendations)
 
 def generate_feedback(score: int, topic: str, correct: int, total: int) -> str:
@@ -321,7 +364,7 @@ def generate_feedback(score: int, topic: str, correct: int, total: int) -> str:
 def gradio_generate_quiz(topic, difficulty, num_questions):
     """Generate quiz using Gradio interface"""
     try:
-        questions_data = watsonx_service.generate_quiz_questions(
+        questions_data = get_watsonx_service().generate_quiz_questions(
             topic=topic,
             difficulty=difficulty,
             num_questions=int(num_questions)
@@ -353,7 +396,7 @@ def gradio_generate_quiz(topic, difficulty, num_questions):
 def gradio_get_recommendations(user_id):
     """Get learning recommendations using Gradio"""
     try:
-        recommendations = pinecone_service.get_adaptive_recommendations(user_id)
+        recommendations = get_pinecone_service().get_adaptive_recommendations(user_id)
         
         rec_text = "# 🎯 Personalized Learning Recommendations\n\n"
         rec_text += "*Powered by Pinecone Vector Database & AI Analytics*\n\n"
@@ -397,14 +440,14 @@ def gradio_analyze_performance(user_email):
         if not user:
             return "❌ User not found. Please check the email address."
         
-        user_attempts = [attempt for attempt in attempts_db.values() if attempt['user_id'] == user['id']]
+        user_attempts = get_storage().get_attempt_scores_for_user(user['id'])
         
         if not user_attempts:
             return f"📊 No quiz data found for {user['name']}. Take some quizzes first!"
         
         # Calculate statistics
         total_quizzes = len(user_attempts)
-        scores = [attempt['score'] for attempt in user_attempts]
+        scores = [attempt.score for attempt in user_attempts]
         avg_score = sum(scores) / total_quizzes
         best_score = max(scores)
         recent_scores = scores[-3:] if len(scores) >= 3 else scores
@@ -429,12 +472,11 @@ def gradio_analyze_performance(user_email):
         # Topic analysis
         topic_performance = {}
         for attempt in user_attempts:
-            quiz = quizzes_db.get(attempt['quiz_id'])
-            if quiz:
-                topic = quiz['topic']
+            topic = attempt.topic
+            if topic:
                 if topic not in topic_performance:
                     topic_performance[topic] = []
-                topic_performance[topic].append(attempt['score'])
+                topic_performance[topic].append(attempt.score)
         
         if topic_performance:
             analysis_text += "## 📚 Subject Performance:\n"
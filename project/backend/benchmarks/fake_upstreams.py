@@ -0,0 +1,364 @@
+"""Local HTTP stand-ins for the Watsonx, Pinecone and Google Classroom APIs.
+
+Each server speaks enough of the real wire format for the backend's clients, with
+configurable latency distributions, error rates and templated responses, so load
+tests exercise real sockets, serialization and timeouts on an offline machine.
+
+    cd backend
+    python benchmarks/fake_upstreams.py --watsonx-latency lognormal:1500:0.5 --watsonx-error-rate 0.02
+
+Point the backend at them with:
+
+    WATSONX_TRANSPORT=rest WATSONX_URL=http://127.0.0.1:8101 WATSONX_IAM_URL=http://127.0.0.1:8101
+    WATSONX_APIKEY=fake WATSONX_PROJECT_ID=fake
+    PINECONE_API_KEY=fake PINECONE_HOST=http://127.0.0.1:8102
+    GOOGLE_CLASSROOM_API_ENDPOINT=http://127.0.0.1:8103
+
+Latency specs: none, fixed:MS, uniform:MIN_MS:MAX_MS, lognormal:MEDIAN_MS:SIGMA.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.mock_question_bank import sample_mock_questions
+
+SINGLE_PROMPT = re.compile(r"(?:Generate|Write) (\d+) [^\n]*?questions about (.+?) at (\w+) difficulty")
+BATCH_SECTION = re.compile(r'- "(s\d+)": (\d+) questions about (.+?) at (\w+) difficulty level')
+
+class LatencyModel:
+    """Random response delay drawn from a fixed, uniform or lognormal distribution"""
+
+    def __init__(self, spec: str, rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+        parts = spec.split(":")
+        self.kind = parts[0]
+        self.args = [float(p) for p in parts[1:]]
+        expected = {"none": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.args) != expected[self.kind]:
+            raise ValueError(f"Bad latency spec {spec!r}; use none, fixed:MS, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+
+    def sample(self) -> float:
+        """Delay in seconds"""
+        if self.kind == "fixed":
+            ms = self.args[0]
+        elif self.kind == "uniform":
+            ms = self.rng.uniform(*self.args)
+        elif self.kind == "lognormal":
+            ms = self.rng.lognormvariate(math.log(self.args[0]), self.args[1])
+        else:
+            ms = 0.0
+        return ms / 1000
+
+class UpstreamBehavior:
+    """Latency and failure injection shared by one server's handlers"""
+
+    def __init__(self, latency: str, error_rate: float, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def delay(self, extra: float = 0.0):
+        with self.lock:
+            delay = self.latency.sample()
+        time.sleep(delay + extra)
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def chance(self, rate: float) -> bool:
+        with self.lock:
+            return self.rng.random() < rate
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Shared plumbing: JSON bodies, injected failures and quiet logging"""
+
+    behavior: UpstreamBehavior
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def read_json(self) -> Dict:
+        body = self.read_body()
+        return json.loads(body) if body else {}
+
+    def send_json(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def inject_failure(self) -> bool:
+        """Answer with a retryable error if this request was chosen to fail"""
+        if not self.behavior.should_fail():
+            return False
+        self.behavior.delay()
+        status = self.behavior.rng.choice([429, 500, 503])
+        self.send_json(status, {"error": "injected failure", "status": status})
+        return True
+
+class WatsonxHandler(FakeHandler):
+    """IAM token exchange plus /ml/v1/text/generation and its event-stream variant"""
+
+    ms_per_question = 0.0
+    chatty_rate = 0.0
+    truncate_rate = 0.0
+    stream_chunks = 8
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/identity/token":
+            self.read_body()
+            self.send_json(200, {"access_token": "fake-token", "expires_in": 3600,
+                                 "expiration": int(time.time()) + 3600})
+            return
+
+        if path not in ("/ml/v1/text/generation", "/ml/v1/text/generation_stream"):
+            self.send_json(404, {"error": f"unknown path {path}"})
+            return
+
+        request = self.read_json()
+        if self.inject_failure():
+            return
+
+        text, questions = self.generate(request.get("input", ""))
+        self.behavior.delay(questions * self.ms_per_question / 1000)
+        if path.endswith("_stream"):
+            self.stream_text(text)
+        else:
+            self.send_json(200, {
+                "model_id": request.get("model_id"),
+                "results": [{"generated_text": text, "stop_reason": "eos_token"}]
+            })
+
+    def generate(self, prompt: str) -> Tuple[str, int]:
+        """Templated model output for a single-topic or batched prompt, and its question count"""
+        sections = BATCH_SECTION.findall(prompt)
+        if sections:
+            payload = {
+                section: sample_mock_questions(topic, difficulty, int(count))
+                for section, count, topic, difficulty in sections
+            }
+            count = sum(int(c) for _, c, _, _ in sections)
+        else:
+            match = SINGLE_PROMPT.search(prompt)
+            count, topic, difficulty = (int(match.group(1)), match.group(2), match.group(3)) if match else (5, "Mathematics", "medium")
+            payload = sample_mock_questions(topic, difficulty, count)
+
+        text = json.dumps(payload, indent=2)
+        if self.behavior.chance(self.chatty_rate):
+            text = "Sure! Here are the questions you asked for:\n\n```json\n" + text + "\n```\nLet me know if you need more."
+        if self.behavior.chance(self.truncate_rate):
+            # Models hitting their token limit stop mid-object
+            text = text[:int(len(text) * self.behavior.rng.uniform(0.5, 0.95))]
+        return text, count
+
+    def stream_text(self, text: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        size = max(1, -(-len(text) // self.stream_chunks))
+        for start in range(0, len(text), size):
+            event = {"results": [{"generated_text": text[start:start + size]}]}
+            self.wfile.write(f"id: {start}\nevent: message\ndata: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.behavior.latency.sample() / self.stream_chunks)
+
+class PineconeHandler(FakeHandler):
+    """Vector upsert and query against an in-memory index"""
+
+    vectors: Dict[str, Dict] = {}
+    vectors_lock = threading.Lock()
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        request = self.read_json()
+        if self.inject_failure():
+            return
+        self.behavior.delay()
+
+        if path == "/vectors/upsert":
+            with self.vectors_lock:
+                for vector in request.get("vectors", []):
+                    self.vectors[vector["id"]] = vector
+            self.send_json(200, {"upsertedCount": len(request.get("vectors", []))})
+        elif path == "/query":
+            top_k = int(request.get("topK", 10))
+            with self.vectors_lock:
+                ids = list(self.vectors)
+            picks = self.behavior.rng.sample(ids, min(top_k, len(ids)))
+            matches = []
+            for vector_id in picks:
+                match = {"id": vector_id, "score": round(self.behavior.rng.random(), 4), "values": []}
+                if request.get("includeMetadata"):
+                    match["metadata"] = self.vectors[vector_id].get("metadata", {})
+                matches.append(match)
+            matches.sort(key=lambda m: m["score"], reverse=True)
+            self.send_json(200, {"matches": matches, "namespace": request.get("namespace", "")})
+        elif path == "/describe_index_stats":
+            with self.vectors_lock:
+                total = len(self.vectors)
+            self.send_json(200, {"dimension": 384, "totalVectorCount": total, "namespaces": {"": {"vectorCount": total}}})
+        else:
+            self.send_json(404, {"error": f"unknown path {path}"})
+
+class ClassroomHandler(FakeHandler):
+    """courses.list and courses.students.list with generated rosters"""
+
+    num_courses = 3
+    students_per_course = 25
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if self.inject_failure():
+            return
+        self.behavior.delay()
+
+        students = re.fullmatch(r"/v1/courses/([^/]+)/students", path)
+        if path == "/v1/courses":
+            subjects = ["Mathematics", "Physics", "Chemistry", "Biology", "Computer Science"]
+            self.send_json(200, {"courses": [
+                {
+                    "id": f"course_{i}",
+                    "name": f"{subjects[i % len(subjects)]} {100 + i}",
+                    "description": f"Section {i} of {subjects[i % len(subjects)]}",
+                    "enrollmentCode": f"code{i:04d}",
+                    "courseState": "ACTIVE"
+                }
+                for i in range(1, self.num_courses + 1)
+            ]})
+        elif students:
+            course_id = students.group(1)
+            self.send_json(200, {"students": [
+                {
+                    "courseId": course_id,
+                    "userId": f"{course_id}_student_{i}",
+                    "profile": {
+                        "name": {"fullName": f"Student {i}"},
+                        "emailAddress": f"student{i}@{course_id}.school.edu"
+                    }
+                }
+                for i in range(1, self.students_per_course + 1)
+            ]})
+        else:
+            self.send_json(404, {"error": {"code": 404, "message": f"unknown path {path}"}})
+
+def _serve(handler: type, behavior: UpstreamBehavior, host: str, port: int, **settings) -> ThreadingHTTPServer:
+    # A subclass per server keeps each one's behavior and settings separate
+    bound = type(handler.__name__, (handler,), {"behavior": behavior, **settings})
+    server = ThreadingHTTPServer((host, port), bound)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"fake-{handler.__name__}", daemon=True).start()
+    return server
+
+def start_fake_upstreams(args: argparse.Namespace) -> Dict[str, ThreadingHTTPServer]:
+    """Start the three stand-ins in background threads and return them by name"""
+    seed = args.seed
+    return {
+        "watsonx": _serve(
+            WatsonxHandler, UpstreamBehavior(args.watsonx_latency, args.watsonx_error_rate, seed),
+            args.host, args.watsonx_port,
+            ms_per_question=args.watsonx_ms_per_question,
+            chatty_rate=args.watsonx_chatty_rate,
+            truncate_rate=args.watsonx_truncate_rate
+        ),
+        "pinecone": _serve(
+            PineconeHandler, UpstreamBehavior(args.pinecone_latency, args.pinecone_error_rate, seed),
+            args.host, args.pinecone_port,
+            vectors={}
+        ),
+        "classroom": _serve(
+            ClassroomHandler, UpstreamBehavior(args.classroom_latency, args.classroom_error_rate, seed),
+            args.host, args.classroom_port,
+            num_courses=args.classroom_courses
+        )
+    }
+
+def backend_env(servers: Dict[str, ThreadingHTTPServer]) -> Dict[str, str]:
+    """Environment variables that point the backend's services at running stand-ins"""
+    def url(name: str) -> str:
+        host, port = servers[name].server_address[:2]
+        return f"http://{host}:{port}"
+
+    return {
+        "WATSONX_TRANSPORT": "rest",
+        "WATSONX_URL": url("watsonx"),
+        "WATSONX_IAM_URL": url("watsonx"),
+        "WATSONX_APIKEY": "fake",
+        "WATSONX_PROJECT_ID": "fake",
+        "PINECONE_API_KEY": "fake",
+        "PINECONE_HOST": url("pinecone"),
+        "GOOGLE_CLASSROOM_API_ENDPOINT": url("classroom")
+    }
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--seed", type=int, default=None, help="make latency and failures reproducible")
+
+    parser.add_argument("--watsonx-port", type=int, default=8101)
+    parser.add_argument("--watsonx-latency", default="lognormal:1200:0.5")
+    parser.add_argument("--watsonx-ms-per-question", type=float, default=150.0,
+                        help="extra generation time per requested question")
+    parser.add_argument("--watsonx-error-rate", type=float, default=0.0)
+    parser.add_argument("--watsonx-chatty-rate", type=float, default=0.0,
+                        help="share of responses wrapped in commentary and code fences")
+    parser.add_argument("--watsonx-truncate-rate", type=float, default=0.0,
+                        help="share of responses cut off mid-object")
+
+    parser.add_argument("--pinecone-port", type=int, default=8102)
+    parser.add_argument("--pinecone-latency", default="lognormal:25:0.4")
+    parser.add_argument("--pinecone-error-rate", type=float, default=0.0)
+
+    parser.add_argument("--classroom-port", type=int, default=8103)
+    parser.add_argument("--classroom-latency", default="lognormal:120:0.4")
+    parser.add_argument("--classroom-error-rate", type=float, default=0.0)
+    parser.add_argument("--classroom-courses", type=int, default=3)
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    servers = start_fake_upstreams(args)
+    for name, server in servers.items():
+        host, port = server.server_address[:2]
+        print(f"{name:<10} http://{host}:{port}")
+    print("\nBackend environment:")
+    for key, value in backend_env(servers).items():
+        print(f"{key}={value}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Load test for the FastAPI backend, in process or against a running server.
+
+Virtual students log in, generate a quiz, submit it and read their history;
+virtual educators poll /students/progress and /analytics/dashboard. Each stage
+first grows the attempt store to a target size, then runs the mixed workload
+and records throughput, p50/p95/p99 per endpoint and memory growth.
+
+    cd backend
+    python benchmarks/load_test.py --users 20 --educators 2 --duration 15 --stages 0,1000,10000 --json run.json
+    python benchmarks/load_test.py --base-url http://127.0.0.1:8000 --server-pid 12345
+    python benchmarks/load_test.py --fake-upstreams --watsonx-latency lognormal:800:0.5
+
+Needs httpx (pip install httpx), which also backs FastAPI's TestClient.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+TOPICS = ["Mathematics", "Physics", "Chemistry", "Biology", "Computer Science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+STUDENT = ("student@demo.com", "password")
+EDUCATOR = ("teacher@demo.com", "password")
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident set size of pid (default: this process) in MiB, where /proc is available"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        if pid is None:
+            # Peak rather than current, but better than nothing off Linux
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+        return None
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Recorder:
+    """Latency samples and error counts per endpoint for one stage"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str,
+                      **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[name].append(time.perf_counter() - started)
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][response.status_code] += 1
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response
+
+    def summary(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for name, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            endpoints[name] = {
+                "requests": len(samples),
+                "errors": self.errors[name],
+                "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "status_codes": dict(self.statuses[name])
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        return {
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "endpoints": endpoints
+        }
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, account: Tuple[str, str]) -> Dict:
+    response = await recorder.request(client, "POST /auth/login", "POST", "/auth/login",
+                                      json={"email": account[0], "password": account[1]})
+    if response is None:
+        raise RuntimeError(f"Login failed for {account[0]}")
+    return response.json()
+
+async def student_session(client: httpx.AsyncClient, recorder: Recorder, deadline: float,
+                          args: argparse.Namespace, rng: random.Random):
+    session = await login(client, recorder, STUDENT)
+    headers = {"Authorization": f"Bearer {session['token']}"}
+    user_id = session["user"]["id"]
+    while time.monotonic() < deadline:
+        quiz = await recorder.request(
+            client, "POST /quiz/generate", "POST", "/quiz/generate", headers=headers,
+            json={"topic": rng.choice(TOPICS), "difficulty": rng.choice(DIFFICULTIES),
+                  "num_questions": args.questions}
+        )
+        if quiz is not None:
+            questions = quiz.json()["questions"]
+            await recorder.request(
+                client, "POST /quiz/submit", "POST", "/quiz/submit", headers=headers,
+                json={"quiz_id": quiz.json()["id"], "answers": [rng.randrange(4) for _ in questions],
+                      "time_spent": rng.randint(30, 600)}
+            )
+        await recorder.request(client, "GET /quiz/history/{user_id}", "GET", f"/quiz/history/{user_id}", headers=headers)
+        if args.think_ms:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+async def educator_session(client: httpx.AsyncClient, recorder: Recorder, deadline: float,
+                           args: argparse.Namespace, rng: random.Random):
+    session = await login(client, recorder, EDUCATOR)
+    headers = {"Authorization": f"Bearer {session['token']}"}
+    while time.monotonic() < deadline:
+        await recorder.request(client, "GET /students/progress", "GET", "/students/progress", headers=headers)
+        await recorder.request(client, "GET /analytics/dashboard", "GET", "/analytics/dashboard", headers=headers)
+        if args.think_ms:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+async def count_attempts(client: httpx.AsyncClient, headers: Dict[str, str]) -> int:
+    response = await client.get("/analytics/dashboard", headers=headers)
+    response.raise_for_status()
+    return response.json()["overview"]["total_quizzes"]
+
+async def seed_attempts(client: httpx.AsyncClient, target: int, concurrency: int, rng: random.Random) -> int:
+    """Submit attempts through the API until the store holds target of them; not recorded in the stats"""
+    educator = (await client.post("/auth/login", json={"email": EDUCATOR[0], "password": EDUCATOR[1]})).json()
+    student = (await client.post("/auth/login", json={"email": STUDENT[0], "password": STUDENT[1]})).json()
+    educator_headers = {"Authorization": f"Bearer {educator['token']}"}
+    student_headers = {"Authorization": f"Bearer {student['token']}"}
+
+    missing = target - await count_attempts(client, educator_headers)
+    if missing <= 0:
+        return 0
+
+    quizzes = []
+    for topic in TOPICS:
+        response = await client.post("/quiz/generate", headers=student_headers,
+                                     json={"topic": topic, "difficulty": "medium", "num_questions": 5})
+        response.raise_for_status()
+        quizzes.append(response.json())
+
+    remaining = missing
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            quiz = rng.choice(quizzes)
+            await client.post("/quiz/submit", headers=student_headers, json={
+                "quiz_id": quiz["id"],
+                "answers": [rng.randrange(4) for _ in quiz["questions"]],
+                "time_spent": rng.randint(30, 600)
+            })
+
+    await asyncio.gather(*[worker() for _ in range(max(1, concurrency))])
+    return missing
+
+async def run_stage(client: httpx.AsyncClient, attempts_target: int, args: argparse.Namespace,
+                    rng: random.Random, server_pid: Optional[int]) -> Dict:
+    seed_started = time.perf_counter()
+    seeded = await seed_attempts(client, attempts_target, args.users, rng)
+    seed_seconds = time.perf_counter() - seed_started
+
+    memory_before = rss_mb(server_pid)
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = time.monotonic() + args.duration
+    sessions = [student_session(client, recorder, deadline, args, random.Random(rng.random())) for _ in range(args.users)]
+    sessions += [educator_session(client, recorder, deadline, args, random.Random(rng.random())) for _ in range(args.educators)]
+    await asyncio.gather(*sessions)
+    elapsed = time.perf_counter() - started
+    memory_after = rss_mb(server_pid)
+
+    summary = recorder.summary(elapsed)
+    educator_p95 = max(
+        (summary["endpoints"].get(name, {}).get("p95_ms", 0.0) for name in ("GET /students/progress", "GET /analytics/dashboard")),
+        default=0.0
+    )
+    error_rate = summary["errors"] / summary["requests"] if summary["requests"] else 0.0
+    return {
+        "attempts_target": attempts_target,
+        "attempts_seeded": seeded,
+        "seed_seconds": seed_seconds,
+        "duration_s": elapsed,
+        **summary,
+        "error_rate": error_rate,
+        "memory_mb": {
+            "before": memory_before,
+            "after": memory_after,
+            "growth": memory_after - memory_before if memory_before is not None and memory_after is not None else None
+        },
+        "educator_p95_ms": educator_p95,
+        "within_slo": educator_p95 <= args.slo_ms and error_rate <= args.max_error_rate
+    }
+
+def print_stage(stage: Dict):
+    memory = stage["memory_mb"]
+    growth = f"{memory['growth']:+.1f} MiB" if memory["growth"] is not None else "n/a"
+    print(f"\n== {stage['attempts_target']} attempts: {stage['throughput_rps']:.1f} req/s, "
+          f"{stage['errors']} errors, memory {growth}, {'OK' if stage['within_slo'] else 'SLO BREACHED'}")
+    print(f"  {'endpoint':<30} {'reqs':>7} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in stage["endpoints"].items():
+        print(f"  {name:<30} {stats['requests']:>7} {stats['errors']:>5} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+async def run(args: argparse.Namespace) -> Dict:
+    rng = random.Random(args.seed)
+    servers = None
+    if args.fake_upstreams:
+        import fake_upstreams
+        fake_args = fake_upstreams.build_parser().parse_args([
+            "--watsonx-port", "0", "--pinecone-port", "0", "--classroom-port", "0",
+            "--watsonx-latency", args.watsonx_latency,
+            "--watsonx-error-rate", str(args.watsonx_error_rate)
+        ])
+        servers = fake_upstreams.start_fake_upstreams(fake_args)
+        os.environ.update(fake_upstreams.backend_env(servers))
+
+    limits = httpx.Limits(max_connections=args.users + args.educators + 8)
+    timeout = httpx.Timeout(args.timeout)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout)
+        server_pid = args.server_pid
+    else:
+        import logging
+        import tempfile
+        logging.disable(logging.INFO)
+        # Keep in-process runs off the developer's database
+        os.environ.setdefault("STORAGE_PATH", os.path.join(tempfile.mkdtemp(prefix="edututor-load-"), "load.db"))
+        import main
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://backend",
+                                   limits=limits, timeout=timeout)
+        server_pid = None
+
+    stages = []
+    try:
+        async with client:
+            for target in args.stages:
+                stage = await run_stage(client, target, args, rng, server_pid)
+                print_stage(stage)
+                stages.append(stage)
+    finally:
+        for server in (servers or {}).values():
+            server.shutdown()
+
+    failing = next((stage["attempts_target"] for stage in stages if not stage["within_slo"]), None)
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "config": {
+            "users": args.users,
+            "educators": args.educators,
+            "duration_s": args.duration,
+            "questions": args.questions,
+            "think_ms": args.think_ms,
+            "slo_ms": args.slo_ms,
+            "max_error_rate": args.max_error_rate,
+            "fake_upstreams": args.fake_upstreams,
+            "seed": args.seed
+        },
+        "stages": stages,
+        "first_failing_attempt_count": failing
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="drive a running server instead of the app in process")
+    parser.add_argument("--server-pid", type=int, help="pid of the server to sample memory from (loopback mode)")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual students")
+    parser.add_argument("--educators", type=int, default=2, help="concurrent virtual educators")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of load per stage")
+    parser.add_argument("--stages", type=lambda v: [int(x) for x in v.split(",")], default=[0, 1000, 5000],
+                        help="comma-separated attempt counts to grow the store to before each stage")
+    parser.add_argument("--questions", type=int, default=5, help="questions per generated quiz")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's iterations")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--slo-ms", type=float, default=1000, help="educator p95 above this marks a stage as failing")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fake-upstreams", action="store_true", help="start the local stand-in servers and use them")
+    parser.add_argument("--watsonx-latency", default="lognormal:800:0.5")
+    parser.add_argument("--watsonx-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args()
+
+    if args.fake_upstreams and args.base_url:
+        parser.error("--fake-upstreams only applies to in-process runs; start the stand-ins next to your server instead")
+
+    results = asyncio.run(run(args))
+    if results["first_failing_attempt_count"] is not None:
+        print(f"\nEducator endpoints breach the SLO at {results['first_failing_attempt_count']} attempts")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Memory benchmark for stored quizzes: bytes per quiz for each in-memory representation.
+
+Builds the same set of quizzes three ways and measures the heap each one
+retains with tracemalloc:
+
+  pydantic  a dict of Quiz models, as quizzes_db held them originally
+  dict      a dict of JSON-shaped dicts
+  compact   MemoryStorage: slotted CompactQuiz records over the shared question store
+
+Questions are drawn from the mock bank, so quizzes reuse questions the way
+pooled and cached questions are reused, and every quiz is round-tripped through
+JSON so its strings are separate objects, as they are after LLM parsing.
+--unique-questions makes every question distinct instead, the worst case for
+deduplication.
+
+    cd backend
+    python benchmarks/memory_benchmark.py --quizzes 5000 --questions 10
+    python benchmarks/memory_benchmark.py --quizzes 20000 --unique-questions --json memory.json
+"""
+import argparse
+import gc
+import importlib
+import json
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+TOPICS = ["Mathematics", "Physics", "Chemistry", "Biology", "Computer Science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+def make_quizzes(count: int, num_questions: int, unique: bool = False) -> List[str]:
+    """Quizzes as JSON documents, so each representation decodes its own copies"""
+    from services.mock_question_bank import sample_mock_questions
+
+    documents = []
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)]
+        difficulty = DIFFICULTIES[(i // len(TOPICS)) % len(DIFFICULTIES)]
+        questions = sample_mock_questions(topic, difficulty, num_questions, seed=i)
+        if unique:
+            for q in questions:
+                q["question"] = f"{q['question']} (variant {i})"
+        documents.append(json.dumps({
+            "id": f"quiz_{i:032x}",
+            "title": f"{topic} Quiz - {difficulty.title()}",
+            "topic": topic,
+            "difficulty": difficulty,
+            "questions": [{"id": f"q_{n+1}", **q} for n, q in enumerate(questions)],
+            "time_limit": 30,
+            "created_at": "2025-01-01T00:00:00.000000",
+            "is_diagnostic": False
+        }))
+    return documents
+
+def build_pydantic(documents: List[str]):
+    from main import Quiz
+    return {quiz.id: quiz for quiz in (Quiz(**json.loads(doc)) for doc in documents)}
+
+def build_dict(documents: List[str]):
+    return {quiz["id"]: quiz for quiz in (json.loads(doc) for doc in documents)}
+
+def build_compact(documents: List[str]):
+    from services.storage import MemoryStorage
+    storage = MemoryStorage()
+    for doc in documents:
+        storage.save_quiz(json.loads(doc))
+    return storage
+
+REPRESENTATIONS: Dict[str, Callable] = {
+    "pydantic": build_pydantic,
+    "dict": build_dict,
+    "compact": build_compact
+}
+
+def measure(build: Callable, documents: List[str]) -> int:
+    """Bytes still allocated after build returns, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build(documents)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    gc.collect()
+    return retained
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quizzes", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=10, help="questions per quiz")
+    parser.add_argument("--unique-questions", action="store_true",
+                        help="give every quiz its own questions instead of reusing the mock bank's")
+    parser.add_argument("--only", choices=sorted(REPRESENTATIONS), action="append",
+                        help="measure just this representation (repeatable)")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+    # Import everything up front so module objects are not charged to the first representation
+    for module in ("main", "services.storage"):
+        importlib.import_module(module)
+
+    documents = make_quizzes(args.quizzes, args.questions, args.unique_questions)
+    results = {
+        "quizzes": args.quizzes,
+        "questions_per_quiz": args.questions,
+        "unique_questions": args.unique_questions,
+        "representations": {}
+    }
+    for name in args.only or list(REPRESENTATIONS):
+        retained = measure(REPRESENTATIONS[name], documents)
+        results["representations"][name] = {
+            "total_mib": retained / (1024 * 1024),
+            "bytes_per_quiz": retained / args.quizzes
+        }
+
+    print(f"{args.quizzes} quizzes x {args.questions} {'unique' if args.unique_questions else 'reused'} questions")
+    print(f"  {'representation':<16}{'total MiB':>12}{'bytes/quiz':>14}")
+    for name, entry in results["representations"].items():
+        print(f"  {name:<16}{entry['total_mib']:>12.2f}{entry['bytes_per_quiz']:>14.0f}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cold-start benchmark for the backend, based on ``python -X importtime``.
+
+Imports a module (``main`` by default) in fresh interpreters and reports the
+wall-clock import time plus the modules with the largest cumulative import cost.
+
+    cd backend
+    python benchmarks/startup_benchmark.py --runs 5 --top 15
+    python benchmarks/startup_benchmark.py --module services.watsonx_service --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_once(module: str) -> Dict:
+    """Import module in a fresh interpreter and parse its -X importtime report"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    # Lines look like: "import time:       412 |       1034 |   encodings"
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+        cumulative[name.strip()] = int(cumulative_us)
+
+    return {
+        "wall_ms": wall_ms,
+        "import_ms": cumulative.get(module, 0) / 1000,
+        "cumulative_us": cumulative
+    }
+
+def summarize(module: str, runs: List[Dict], top: int) -> Dict:
+    last = runs[-1]["cumulative_us"]
+    heaviest = sorted(last.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "runs": len(runs),
+        "wall_ms": {
+            "min": min(r["wall_ms"] for r in runs),
+            "median": statistics.median(r["wall_ms"] for r in runs)
+        },
+        "import_ms": {
+            "min": min(r["import_ms"] for r in runs),
+            "median": statistics.median(r["import_ms"] for r in runs)
+        },
+        "heaviest_imports_ms": [
+            {"module": name, "cumulative_ms": us / 1000}
+            for name, us in heaviest[:top]
+        ]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import, relative to backend/")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="how many of the heaviest imports to list")
+    parser.add_argument("--json", dest="json_path", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    summary = summarize(args.module, runs, args.top)
+
+    print(f"import {args.module}: median {summary['import_ms']['median']:.1f} ms "
+          f"(min {summary['import_ms']['min']:.1f} ms), interpreter wall median {summary['wall_ms']['median']:.1f} ms")
+    for entry in summary["heaviest_imports_ms"]:
+        print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,28 @@
 import os
 import json
-import uvicorn
+import threading
+import time
+import uuid
+from collections import Counter
 from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
 
-# Import services
-from services.watsonx_service import watsonx_service
-from services.pinecone_service import pinecone_service
-from services.google_classroom_service import google_classroom_service
+# Import service accessors; the services (and their SDKs) are built on first use
+from services.watsonx_service import get_watsonx_service, shutdown_watsonx_service, watsonx_configured
+from services.question_pool import get_question_pool, stop_question_pool
+from services.pinecone_service import get_pinecone_service, shutdown_pinecone_service
+from services.google_classroom_service import get_google_classroom_service
+from services.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from services.auth_tokens import get_token_signer, TokenError
+from services.storage import get_storage, close_storage
+from services.quiz_records import QUESTION_STORE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,9 +39,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "Request latency per route, until the last body chunk is sent",
+    ["method", "route", "status"])
+STORE_SIZE = REGISTRY.gauge("store_entries", "Entries held in the in-memory stores", ["store"])
+
+class RequestMetricsMiddleware:
+    """Plain ASGI middleware timing every request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by template ("/quiz/{quiz_id}") so ids never explode the series count
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            ).observe(time.perf_counter() - started)
+
+app.add_middleware(RequestMetricsMiddleware)
+
 # Security
 security = HTTPBearer()
 
+# Diagnostic test generation limits (timeout applies per LLM call)
+DIAGNOSTIC_MAX_PARALLEL = int(os.getenv("DIAGNOSTIC_MAX_PARALLEL", "5"))
+DIAGNOSTIC_SUBJECT_TIMEOUT = float(os.getenv("DIAGNOSTIC_SUBJECT_TIMEOUT", "30"))
+BATCH_SUBMIT_MAX = int(os.getenv("BATCH_SUBMIT_MAX", "10000"))
+
 # Pydantic models
 class UserLogin(BaseModel):
     email: str
@@ -46,15 +99,27 @@ class QuizGenerationRequest(BaseModel):
     difficulty: str
     num_questions: int = 5
     user_id: Optional[str] = None
+    fresh: bool = False  # bypass the question cache
 
 class QuizSubmissionRequest(BaseModel):
     quiz_id: str
     answers: List[int]
     time_spent: int = 0
 
+class BatchSubmission(BaseModel):
+    quiz_id: str
+    answers: List[int]
+    time_spent: int = 0
+    user_id: Optional[str] = None  # educators importing answer sheets submit for their students
+
+class BatchSubmissionRequest(BaseModel):
+    submissions: List[BatchSubmission]
+
 class DiagnosticTestRequest(BaseModel):
     user_id: str
     subjects: List[str]
+    max_parallel: Optional[int] = None
+    subject_timeout: Optional[float] = None
 
 class Question(BaseModel):
     id: str
@@ -83,6 +148,16 @@ class QuizAttempt(BaseModel):
     time_spent: int
     feedback: Optional[str] = None
 
+class BatchSubmissionResult(BaseModel):
+    index: int
+    attempt: Optional[QuizAttempt] = None
+    error: Optional[str] = None
+
+class BatchSubmissionResponse(BaseModel):
+    submitted: int
+    failed: int
+    results: List[BatchSubmissionResult]
+
 class UserProfile(BaseModel):
     id: str
     email: str
@@ -113,22 +188,77 @@ users_db = {
     }
 }
 
-quizzes_db = {}
-attempts_db = {}
+# Same user dicts keyed by id, for profile lookups from token claims and attempts
+users_by_id = {user["id"]: user for user in users_db.values()}
+
+# Users per role, kept in step with users_db so the dashboard never scans it
+users_per_role = Counter(user["role"] for user in users_db.values())
+
+def _register_user(user: Dict):
+    """Add or replace a user in both user maps"""
+    replaced = users_db.get(user["email"])
+    if replaced is not None:
+        users_per_role[replaced["role"]] -= 1
+    users_db[user["email"]] = user
+    users_by_id[user["id"]] = user
+    users_per_role[user["role"]] += 1
+
+def _issue_token(user: Dict) -> str:
+    return get_token_signer().issue({
+        "sub": user["id"],
+        "email": user["email"],
+        "name": user["name"],
+        "role": user["role"]
+    })
+
+# Quizzes and attempts live in services.storage (SQLite by default, see STORAGE_BACKEND)
+
+# Read at scrape time only
+STORE_SIZE.set_function(lambda: len(users_db), "users")
+STORE_SIZE.set_function(lambda: get_storage().count_quizzes(), "quizzes")
+STORE_SIZE.set_function(lambda: get_storage().count_live_quizzes(), "live_quizzes")
+STORE_SIZE.set_function(lambda: get_storage().count_attempts(), "attempts")
+STORE_SIZE.set_function(lambda: QUESTION_STORE.stats()["questions"], "questions")
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token"""
-    token = credentials.credentials
-    # In production, validate JWT token
-    for user in users_db.values():
-        if user["id"] == token:
-            return user
-    raise HTTPException(status_code=401, detail="Invalid token")
+    """Get current user from the signed token's claims, without touching the user store"""
+    try:
+        claims = get_token_signer().verify(credentials.credentials)
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return {
+        "id": claims["sub"],
+        "email": claims["email"],
+        "name": claims["name"],
+        "role": claims["role"]
+    }
+
+@app.on_event("startup")
+async def start_services():
+    """Start background workers"""
+    # Pooling only pays off when questions come from the real model. Warm it off the
+    # startup path so the worker accepts requests before the LLM client is built.
+    if watsonx_configured():
+        threading.Thread(target=lambda: get_question_pool().start(), name="question-pool-init", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    """Release background resources held by the services"""
+    stop_question_pool()
+    shutdown_watsonx_service()
+    shutdown_pinecone_service()
+    close_storage()
 
 @app.get("/")
 async def root():
     return {"message": "EduTutor AI Backend v2.0 is running!", "features": ["IBM Watsonx", "Pinecone", "Google Classroom"]}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of request, LLM, Pinecone and Classroom metrics"""
+    # Rendered in the threadpool: the store gauges run storage COUNT queries at scrape time
+    return Response(await run_in_threadpool(REGISTRY.render), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/auth/login")
 async def login(request: UserLogin):
     """User login with email and password"""
@@ -137,9 +267,9 @@ async def login(request: UserLogin):
         if not user or user["password"] != request.password:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
-        # Return user data with token (user ID as token for demo)
+        # Return user data with a signed token
         return {
-            "token": user["id"],
+            "token": _issue_token(user),
             "user": {
                 "id": user["id"],
                 "email": user["email"],
@@ -157,7 +287,7 @@ async def google_auth(request: GoogleAuthRequest):
     """Google OAuth authentication"""
     try:
         # Exchange code for credentials
-        credentials = google_classroom_service.exchange_code_for_credentials(
+        credentials = get_google_classroom_service().exchange_code_for_credentials(
             request.code, request.redirect_uri
         )
         
@@ -169,9 +299,13 @@ async def google_auth(request: GoogleAuthRequest):
             "role": "student",
             "diagnostic_completed": False
         }
+        # Known to the user maps from now on, so profile lookups by id work for this account too
+        if user_data["id"] not in users_by_id:
+            _register_user({**user_data, "learning_preferences": {}})
+        user_data["diagnostic_completed"] = users_by_id[user_data["id"]]["diagnostic_completed"]
         
         return {
-            "token": user_data["id"],
+            "token": _issue_token(user_data),
             "user": user_data
         }
     except Exception as e:
@@ -184,23 +318,23 @@ async def create_diagnostic_test(request: DiagnosticTestRequest):
     try:
         logger.info(f"Creating diagnostic test for user: {request.user_id}")
         
-        # Generate diagnostic questions across multiple subjects
+        # Generate all subjects together: packed into as few LLM calls as fit, run concurrently
+        subject_questions = await get_watsonx_service().agenerate_quiz_batch(
+            [(subject, "medium", 3) for subject in request.subjects],
+            max_parallel=request.max_parallel or DIAGNOSTIC_MAX_PARALLEL,
+            timeout=request.subject_timeout or DIAGNOSTIC_SUBJECT_TIMEOUT
+        )
+        
+        # Results come back in subject order, so ids stay stable
         all_questions = []
         question_id = 1
-        
-        for subject in request.subjects:
-            questions = watsonx_service.generate_quiz_questions(
-                topic=subject,
-                difficulty="medium",
-                num_questions=3
-            )
-            
+        for questions in subject_questions:
             for q in questions:
                 q["id"] = f"diag_{question_id}"
                 question_id += 1
                 all_questions.append(Question(**q))
         
-        quiz_id = f"diagnostic_{datetime.now().timestamp()}"
+        quiz_id = f"diagnostic_{uuid.uuid4().hex}"
         quiz = Quiz(
             id=quiz_id,
             title="Diagnostic Assessment",
@@ -212,7 +346,7 @@ async def create_diagnostic_test(request: DiagnosticTestRequest):
             is_diagnostic=True
         )
         
-        quizzes_db[quiz_id] = quiz
+        await run_in_threadpool(get_storage().save_quiz, quiz.model_dump())
         logger.info(f"Created diagnostic test with {len(all_questions)} questions")
         return quiz
         
@@ -220,26 +354,28 @@ async def create_diagnostic_test(request: DiagnosticTestRequest):
         logger.error(f"Error creating diagnostic test: {e}")
         raise HTTPException(status_code=500, detail="Failed to create diagnostic test")
 
+def _personalized_difficulty(user_id: str, requested: str) -> str:
+    """Adjust difficulty based on user performance"""
+    user_preferences = get_pinecone_service().get_adaptive_recommendations(user_id)
+    return user_preferences.get("recommended_difficulty") or requested
+
 @app.post("/quiz/generate", response_model=Quiz)
 async def generate_quiz(request: QuizGenerationRequest, current_user: dict = Depends(get_current_user)):
     """Generate personalized quiz using IBM Granite model"""
     try:
         logger.info(f"Generating quiz for user: {current_user['id']}, topic: {request.topic}")
         
-        # Get user's learning preferences for personalization
-        user_preferences = pinecone_service.get_adaptive_recommendations(current_user["id"])
+        adjusted_difficulty = _personalized_difficulty(current_user["id"], request.difficulty)
         
-        # Adjust difficulty based on user performance
-        adjusted_difficulty = request.difficulty
-        if user_preferences.get("recommended_difficulty"):
-            adjusted_difficulty = user_preferences["recommended_difficulty"]
-        
-        # Generate questions using Watsonx
-        questions_data = watsonx_service.generate_quiz_questions(
-            topic=request.topic,
-            difficulty=adjusted_difficulty,
-            num_questions=request.num_questions
-        )
+        # Serve from the warm pool when possible, otherwise generate using Watsonx
+        questions_data = get_question_pool().take(request.topic, adjusted_difficulty, request.num_questions)
+        if questions_data is None:
+            questions_data = await get_watsonx_service().agenerate_quiz_questions(
+                topic=request.topic,
+                difficulty=adjusted_difficulty,
+                num_questions=request.num_questions,
+                use_cache=not request.fresh
+            )
         
         # Create Question objects
         questions = []
@@ -253,7 +389,7 @@ async def generate_quiz(request: QuizGenerationRequest, current_user: dict = Dep
             )
             questions.append(question)
         
-        quiz_id = f"quiz_{datetime.now().timestamp()}"
+        quiz_id = f"quiz_{uuid.uuid4().hex}"
         quiz = Quiz(
             id=quiz_id,
             title=f"{request.topic} Quiz - {adjusted_difficulty.title()}",
@@ -265,7 +401,7 @@ async def generate_quiz(request: QuizGenerationRequest, current_user: dict = Dep
         )
         
         # Store quiz
-        quizzes_db[quiz_id] = quiz
+        await run_in_threadpool(get_storage().save_quiz, quiz.model_dump())
         
         logger.info(f"Generated quiz with ID: {quiz_id}")
         return quiz
@@ -274,6 +410,82 @@ async def generate_quiz(request: QuizGenerationRequest, current_user: dict = Dep
         logger.error(f"Error generating quiz: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
 
+@app.post("/quiz/generate/stream")
+async def generate_quiz_stream(request: QuizGenerationRequest, current_user: dict = Depends(get_current_user)):
+    """Stream a generated quiz as NDJSON: quiz metadata, then each question as soon as it is ready"""
+    logger.info(f"Streaming quiz for user: {current_user['id']}, topic: {request.topic}")
+    
+    adjusted_difficulty = _personalized_difficulty(current_user["id"], request.difficulty)
+    quiz_id = f"quiz_{uuid.uuid4().hex}"
+    created_at = datetime.now().isoformat()
+    title = f"{request.topic} Quiz - {adjusted_difficulty.title()}"
+    
+    async def question_source():
+        pooled = get_question_pool().take(request.topic, adjusted_difficulty, request.num_questions)
+        if pooled is not None:
+            for q_data in pooled:
+                yield q_data
+            return
+        async for q_data in get_watsonx_service().astream_quiz_questions(
+            request.topic, adjusted_difficulty, request.num_questions
+        ):
+            yield q_data
+    
+    async def ndjson_events():
+        yield json.dumps({
+            "type": "quiz",
+            "id": quiz_id,
+            "title": title,
+            "topic": request.topic,
+            "difficulty": adjusted_difficulty,
+            "time_limit": 30,
+            "created_at": created_at
+        }) + "\n"
+        
+        questions = []
+        try:
+            async for q_data in question_source():
+                question = Question(
+                    id=f"q_{len(questions)+1}",
+                    question=q_data["question"],
+                    options=q_data["options"],
+                    correct_answer=q_data["correct_answer"],
+                    explanation=q_data.get("explanation")
+                )
+                questions.append(question)
+                yield json.dumps({"type": "question", "question": question.model_dump()}) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming quiz: {e}")
+            yield json.dumps({"type": "error", "detail": f"Failed to generate quiz: {str(e)}"}) + "\n"
+            return
+        
+        # The quiz becomes submittable once all of its questions have been sent
+        quiz = Quiz(
+            id=quiz_id,
+            title=title,
+            topic=request.topic,
+            difficulty=adjusted_difficulty,
+            questions=questions,
+            time_limit=30,
+            created_at=created_at
+        )
+        await run_in_threadpool(get_storage().save_quiz, quiz.model_dump())
+        logger.info(f"Streamed quiz with ID: {quiz_id}")
+        yield json.dumps({"type": "done", "quiz_id": quiz_id, "num_questions": len(questions)}) + "\n"
+    
+    return StreamingResponse(ndjson_events(), media_type="application/x-ndjson")
+
+@app.get("/quiz/pool/stats")
+async def get_question_pool_stats(current_user: dict = Depends(get_current_user)):
+    """Warm question pool sizes, hit ratio and refill rate"""
+    return {
+        "pool": get_question_pool().stats(),
+        "cache": get_watsonx_service().get_cache_stats(),
+        "coalescing": get_watsonx_service().get_coalescing_stats(),
+        "circuit": get_watsonx_service().get_circuit_stats(),
+        "question_store": QUESTION_STORE.stats()
+    }
+
 @app.post("/quiz/submit", response_model=QuizAttempt)
 async def submit_quiz(request: QuizSubmissionRequest, current_user: dict = Depends(get_current_user)):
     """Submit quiz answers and get results with AI feedback"""
@@ -281,9 +493,10 @@ async def submit_quiz(request: QuizSubmissionRequest, current_user: dict = Depen
         logger.info(f"Submitting quiz: {request.quiz_id} for user: {current_user['id']}")
         
         # Get quiz from storage
-        quiz = quizzes_db.get(request.quiz_id)
-        if not quiz:
+        record = await run_in_threadpool(get_storage().get_quiz, request.quiz_id)
+        if not record:
             raise HTTPException(status_code=404, detail="Quiz not found")
+        quiz = Quiz(**record)
         
         # Calculate score and analyze performance
         correct_answers = 0
@@ -299,10 +512,10 @@ async def submit_quiz(request: QuizSubmissionRequest, current_user: dict = Depen
         score = int((correct_answers / len(quiz.questions)) * 100)
         
         # Generate AI feedback
-        feedback = self._generate_feedback(score, quiz.topic, incorrect_topics)
+        feedback = _generate_feedback(score, quiz.topic, incorrect_topics)
         
         # Create attempt record
-        attempt_id = f"attempt_{datetime.now().timestamp()}"
+        attempt_id = f"attempt_{uuid.uuid4().hex}"
         attempt = QuizAttempt(
             id=attempt_id,
             quiz_id=request.quiz_id,
@@ -314,8 +527,11 @@ async def submit_quiz(request: QuizSubmissionRequest, current_user: dict = Depen
             feedback=feedback
         )
         
-        # Store attempt
-        attempts_db[attempt_id] = attempt
+        # Store attempt, with the quiz's topic so analytics never need to load the quiz
+        await run_in_threadpool(
+            get_storage().save_attempt,
+            {**attempt.model_dump(), "topic": quiz.topic, "difficulty": quiz.difficulty}
+        )
         
         # Store in Pinecone for adaptive learning
         quiz_data = {
@@ -326,11 +542,15 @@ async def submit_quiz(request: QuizSubmissionRequest, current_user: dict = Depen
             "timestamp": datetime.now().isoformat(),
             "is_diagnostic": quiz.is_diagnostic
         }
-        pinecone_service.store_quiz_attempt(current_user["id"], quiz_data)
+        # Only an enqueue, but it can wait for room when the write-behind queue is full
+        await run_in_threadpool(get_pinecone_service().store_quiz_attempt, current_user["id"], quiz_data)
         
-        # Update user diagnostic status if this was a diagnostic test
-        if quiz.is_diagnostic:
-            users_db[current_user["email"]]["diagnostic_completed"] = True
+        # Update user diagnostic status if this was a diagnostic test. The token's user may not be
+        # in this worker's map (signed in on another worker, or before a restart); the attempt is
+        # already stored, so failing here would only make a retry store it twice.
+        user = users_by_id.get(current_user["id"])
+        if quiz.is_diagnostic and user is not None:
+            user["diagnostic_completed"] = True
         
         logger.info(f"Quiz submitted with score: {score}%")
         return attempt
@@ -339,6 +559,89 @@ async def submit_quiz(request: QuizSubmissionRequest, current_user: dict = Depen
         logger.error(f"Error submitting quiz: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to submit quiz: {str(e)}")
 
+@app.post("/quiz/submit/batch", response_model=BatchSubmissionResponse)
+async def submit_quiz_batch(request: BatchSubmissionRequest, current_user: dict = Depends(get_current_user)):
+    """Score and store many submissions at once, e.g. a stack of imported paper answer sheets"""
+    if len(request.submissions) > BATCH_SUBMIT_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_SUBMIT_MAX} submissions per batch")
+    
+    try:
+        return await run_in_threadpool(_submit_batch, request.submissions, current_user)
+    except Exception as e:
+        logger.error(f"Error submitting quiz batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit quiz batch: {str(e)}")
+
+def _submit_batch(submissions: List[BatchSubmission], current_user: dict) -> BatchSubmissionResponse:
+    """Validate, score, and write a batch with one quiz lookup, one storage write and batched Pinecone upserts"""
+    # Imported here: scoring pulls in numpy, which only batch submissions need
+    from services.scoring import answers_in_range, score_submissions
+    
+    storage = get_storage()
+    quizzes = storage.get_quizzes([submission.quiz_id for submission in submissions])
+    
+    results: List[Optional[BatchSubmissionResult]] = [None] * len(submissions)
+    accepted = []
+    for index, submission in enumerate(submissions):
+        user_id = submission.user_id or current_user["id"]
+        quiz = quizzes.get(submission.quiz_id)
+        if user_id != current_user["id"] and current_user["role"] != "educator":
+            error = "Only educators can submit for other users"
+        elif user_id not in users_by_id:
+            error = "User not found"
+        elif not quiz:
+            error = "Quiz not found"
+        elif not quiz["questions"]:
+            error = "Quiz has no questions"
+        elif not answers_in_range(submission.answers):
+            error = "Answer out of range"
+        else:
+            accepted.append((index, submission, user_id))
+            continue
+        results[index] = BatchSubmissionResult(index=index, error=error)
+    
+    # One vectorized pass per distinct quiz instead of a Python loop per answer
+    scores = score_submissions(quizzes, [
+        {"quiz_id": submission.quiz_id, "answers": submission.answers} for _, submission, _ in accepted
+    ])
+    
+    completed_at = datetime.now().isoformat()
+    attempt_records = []
+    pinecone_records = []
+    for (index, submission, user_id), score in zip(accepted, scores):
+        quiz = quizzes[submission.quiz_id]
+        attempt = QuizAttempt(
+            id=f"attempt_{uuid.uuid4().hex}",
+            quiz_id=submission.quiz_id,
+            user_id=user_id,
+            answers=submission.answers,
+            score=score,
+            completed_at=completed_at,
+            time_spent=submission.time_spent,
+            feedback=_generate_feedback(score, quiz["topic"], [])
+        )
+        results[index] = BatchSubmissionResult(index=index, attempt=attempt)
+        attempt_records.append({**attempt.model_dump(), "topic": quiz["topic"], "difficulty": quiz["difficulty"]})
+        pinecone_records.append((attempt.id, {
+            "user_id": user_id,
+            "topic": quiz["topic"],
+            "difficulty": quiz["difficulty"],
+            "score": score,
+            "timestamp": completed_at,
+            "is_diagnostic": quiz.get("is_diagnostic", False)
+        }))
+        if quiz.get("is_diagnostic"):
+            users_by_id[user_id]["diagnostic_completed"] = True
+    
+    storage.save_attempts(attempt_records)
+    get_pinecone_service().store_quiz_attempts(pinecone_records)
+    
+    logger.info(f"Quiz batch submitted: {len(accepted)} scored, {len(submissions) - len(accepted)} rejected")
+    return BatchSubmissionResponse(
+        submitted=len(accepted),
+        failed=len(submissions) - len(accepted),
+        results=results
+    )
+
 def _generate_feedback(score: int, topic: str, incorrect_topics: List[str]) -> str:
     """Generate personalized feedback using AI"""
     if score >= 90:
@@ -355,10 +658,10 @@ async def get_quiz_history(user_id: str, current_user: dict = Depends(get_curren
     """Get quiz history for a user"""
     try:
         # Get from Pinecone
-        history = pinecone_service.get_user_quiz_history(user_id)
+        history = get_pinecone_service().get_user_quiz_history(user_id)
         
         # Also get from local storage
-        user_attempts = [attempt for attempt in attempts_db.values() if attempt.user_id == user_id]
+        user_attempts = [QuizAttempt(**a) for a in await run_in_threadpool(get_storage().get_attempts_for_user, user_id)]
         
         return {
             "attempts": user_attempts,
@@ -377,65 +680,61 @@ async def get_student_progress(current_user: dict = Depends(get_current_user)):
         if current_user["role"] != "educator":
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Get all student attempts
-        student_progress = {}
-        for attempt in attempts_db.values():
-            user_id = attempt.user_id
-            if user_id not in student_progress:
-                # Find user info
-                user_info = None
-                for user in users_db.values():
-                    if user["id"] == user_id:
-                        user_info = user
-                        break
-                
-                if user_info:
-                    student_progress[user_id] = {
-                        "userId": user_id,
-                        "userName": user_info["name"],
-                        "email": user_info["email"],
-                        "totalQuizzes": 0,
-                        "scores": [],
-                        "lastActivity": None,
-                        "topicProgress": {}
-                    }
-            
-            if user_id in student_progress:
-                student_progress[user_id]["totalQuizzes"] += 1
-                student_progress[user_id]["scores"].append(attempt.score)
-                student_progress[user_id]["lastActivity"] = attempt.completed_at
-                
-                # Get quiz info for topic
-                quiz = quizzes_db.get(attempt.quiz_id)
-                if quiz:
-                    topic = quiz.topic
-                    if topic not in student_progress[user_id]["topicProgress"]:
-                        student_progress[user_id]["topicProgress"][topic] = []
-                    student_progress[user_id]["topicProgress"][topic].append(attempt.score)
-        
-        # Calculate averages
-        for user_id, progress in student_progress.items():
-            if progress["scores"]:
-                progress["averageScore"] = sum(progress["scores"]) / len(progress["scores"])
-            else:
-                progress["averageScore"] = 0
-            
-            # Calculate topic averages
-            for topic, scores in progress["topicProgress"].items():
-                progress["topicProgress"][topic] = sum(scores) / len(scores)
-        
-        return list(student_progress.values())
+        return await run_in_threadpool(_student_progress)
         
     except Exception as e:
         logger.error(f"Error getting student progress: {e}")
         raise HTTPException(status_code=500, detail="Failed to get student progress")
 
+def _student_progress() -> List[Dict]:
+    """Per-student totals and topic averages, served from the materialized aggregates"""
+    student_progress = []
+    for user_id, stats in get_storage().get_student_stats().items():
+        user_info = users_by_id.get(user_id)
+        if user_info:
+            student_progress.append(_progress_entry(user_info, stats))
+    return student_progress
+
+def _progress_for_user(user_info: Dict) -> Dict:
+    """One user's progress from their aggregate row"""
+    stats = get_storage().get_student_stats(user_info["id"]).get(user_info["id"])
+    return _progress_entry(user_info, stats or {"attempts": 0, "score_sum": 0, "last_activity": None, "topics": {}})
+
+def _progress_entry(user_info: Dict, stats: Dict) -> Dict:
+    return {
+        "userId": user_info["id"],
+        "userName": user_info["name"],
+        "email": user_info["email"],
+        "totalQuizzes": stats["attempts"],
+        "averageScore": stats["score_sum"] / stats["attempts"] if stats["attempts"] else 0,
+        "lastActivity": stats["last_activity"],
+        "topicProgress": {
+            topic: totals["score_sum"] / totals["attempts"] for topic, totals in stats["topics"].items()
+        }
+    }
+
+@app.get("/students/{user_id}/progress")
+async def get_single_student_progress(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Get progress data for one student (educators, or the student themselves)"""
+    if current_user["role"] != "educator" and current_user["id"] != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    user_info = users_by_id.get(user_id)
+    if not user_info:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    try:
+        return await run_in_threadpool(_progress_for_user, user_info)
+    except Exception as e:
+        logger.error(f"Error getting student progress: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get student progress")
+
 @app.post("/classroom/sync")
 async def sync_classrooms(current_user: dict = Depends(get_current_user)):
     """Sync with Google Classroom"""
     try:
         # Sync classroom data
-        classroom_data = google_classroom_service.sync_classroom_data()
+        classroom_data = get_google_classroom_service().sync_classroom_data()
         
         return {
             "success": True,
@@ -451,7 +750,7 @@ async def sync_classrooms(current_user: dict = Depends(get_current_user)):
 async def get_courses(current_user: dict = Depends(get_current_user)):
     """Get available courses"""
     try:
-        courses = google_classroom_service.get_courses()
+        courses = get_google_classroom_service().get_courses()
         return courses
     except Exception as e:
         logger.error(f"Error getting courses: {e}")
@@ -461,8 +760,8 @@ async def get_courses(current_user: dict = Depends(get_current_user)):
 async def get_recommendations(user_id: str, current_user: dict = Depends(get_current_user)):
     """Get adaptive learning recommendations"""
     try:
-        recommendations = pinecone_service.get_adaptive_recommendations(user_id)
-        similar_users = pinecone_service.get_similar_users(user_id)
+        recommendations = get_pinecone_service().get_adaptive_recommendations(user_id)
+        similar_users = get_pinecone_service().get_similar_users(user_id)
         
         return {
             "recommendations": recommendations,
@@ -481,23 +780,13 @@ async def get_analytics_dashboard(current_user: dict = Depends(get_current_user)
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Calculate overall statistics
-        total_students = len([u for u in users_db.values() if u["role"] == "student"])
-        total_quizzes = len(attempts_db)
+        total_students = users_per_role["student"]
+        storage = get_storage()
+        total_quizzes = await run_in_threadpool(storage.count_attempts)
         
         # Topic performance analysis
-        topic_stats = {}
-        for attempt in attempts_db.values():
-            quiz = quizzes_db.get(attempt.quiz_id)
-            if quiz:
-                topic = quiz.topic
-                if topic not in topic_stats:
-                    topic_stats[topic] = {"scores": [], "attempts": 0}
-                topic_stats[topic]["scores"].append(attempt.score)
-                topic_stats[topic]["attempts"] += 1
-        
-        # Calculate topic averages
-        for topic, stats in topic_stats.items():
-            stats["average"] = sum(stats["scores"]) / len(stats["scores"]) if stats["scores"] else 0
+        topic_stats = await run_in_threadpool(_topic_performance)
+        recent_attempts = await run_in_threadpool(storage.get_recent_attempts, 10)
         
         return {
             "overview": {
@@ -507,7 +796,7 @@ async def get_analytics_dashboard(current_user: dict = Depends(get_current_user)
                 "completion_rate": 85
             },
             "topic_performance": topic_stats,
-            "recent_activity": list(attempts_db.values())[-10:],  # Last 10 attempts
+            "recent_activity": [QuizAttempt(**a) for a in recent_attempts],  # Last 10 attempts
             "trends": {
                 "weekly_growth": 15,
                 "engagement_rate": 78,
@@ -518,5 +807,13 @@ async def get_analytics_dashboard(current_user: dict = Depends(get_current_user)
         logger.error(f"Error getting analytics: {e}")
         raise HTTPException(status_code=500, detail="Failed to get analytics")
 
+def _topic_performance() -> Dict[str, Dict]:
+    """Attempt count and average per topic, served from the materialized aggregates"""
+    return {
+        topic: {"attempts": totals["attempts"], "average": totals["score_sum"] / totals["attempts"]}
+        for topic, totals in get_storage().get_topic_stats().items()
+    }
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Maintenance commands for the backend's storage.
+
+    cd backend
+    python manage.py rebuild-aggregates
+    STORAGE_PATH=/var/lib/edututor/edututor.db python manage.py rebuild-aggregates
+"""
+import argparse
+import logging
+import sys
+import time
+
+from services.storage import create_storage
+
+def rebuild_aggregates(args: argparse.Namespace) -> int:
+    """Recompute student and topic totals from the stored attempts"""
+    storage = create_storage(path=args.path)
+    try:
+        started = time.perf_counter()
+        storage.rebuild_aggregates()
+        students = storage.get_student_stats()
+        topics = storage.get_topic_stats()
+        print(f"Rebuilt totals for {len(students)} students and {len(topics)} topics "
+              f"from {storage.count_attempts()} attempts in {time.perf_counter() - started:.2f}s")
+    finally:
+        storage.close()
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", help="SQLite database file (defaults to STORAGE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild-aggregates", help=rebuild_aggregates.__doc__).set_defaults(func=rebuild_aggregates)
+    return parser
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
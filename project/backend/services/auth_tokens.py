@@ -0,0 +1,82 @@
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenError(Exception):
+    """Raised for a bearer token that is malformed, forged or expired"""
+    pass
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+class TokenSigner:
+    """Issue and verify self-contained HS256 JWTs, so authenticating a request needs no user lookup"""
+
+    # The header never changes, so it is encoded once
+    _HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def __init__(self, secret: bytes, ttl_seconds: int = 43200):
+        self._secret = secret
+        self.ttl_seconds = ttl_seconds
+
+    def issue(self, claims: Dict) -> str:
+        """Sign claims plus issue and expiry times into a compact token"""
+        now = int(time.time())
+        payload = {**claims, "iat": now, "exp": now + self.ttl_seconds}
+        signing_input = f"{self._HEADER}.{_b64encode(json.dumps(payload, separators=(',', ':')).encode())}"
+        return f"{signing_input}.{self._sign(signing_input)}"
+
+    def verify(self, token: str) -> Dict:
+        """Return the token's claims, raising TokenError unless it is well-formed, authentic and unexpired"""
+        # Every part is base64url, so anything else is malformed; checked first because
+        # encoding the signing input and compare_digest both reject non-ASCII str with errors of their own
+        if not token.isascii():
+            raise TokenError("Malformed token")
+        try:
+            header, payload, signature = token.split(".")
+        except ValueError:
+            raise TokenError("Malformed token")
+        if header != self._HEADER:
+            raise TokenError("Unsupported token header")
+        if not hmac.compare_digest(signature, self._sign(f"{header}.{payload}")):
+            raise TokenError("Invalid token signature")
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            raise TokenError("Malformed token payload")
+        if not isinstance(claims, dict) or not isinstance(claims.get("exp", 0), (int, float)):
+            raise TokenError("Malformed token payload")
+        if claims.get("exp", 0) < time.time():
+            raise TokenError("Token expired")
+        return claims
+
+    def _sign(self, signing_input: str) -> str:
+        return _b64encode(hmac.new(self._secret, signing_input.encode("ascii"), hashlib.sha256).digest())
+
+_token_signer: Optional[TokenSigner] = None
+_signer_lock = threading.Lock()
+
+def get_token_signer() -> TokenSigner:
+    """Return the shared signer, keyed by AUTH_SECRET"""
+    global _token_signer
+    if _token_signer is None:
+        with _signer_lock:
+            if _token_signer is None:
+                secret = os.getenv("AUTH_SECRET")
+                if not secret:
+                    logger.warning("AUTH_SECRET not set, using a random key: tokens will not survive a restart or work across workers")
+                    secret = secrets.token_hex(32)
+                _token_signer = TokenSigner(secret.encode(), int(os.getenv("AUTH_TOKEN_TTL", "43200")))
+    return _token_signer
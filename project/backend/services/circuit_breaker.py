@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+    pass
+
+class CircuitBreaker:
+    """Latency-aware circuit breaker over a rolling window of recent call outcomes"""
+
+    def __init__(self, window_size: int = 50, min_calls: int = 10, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 10.0, slow_call_rate: float = 0.8,
+                 open_seconds: float = 30.0, half_open_calls: int = 2):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        # (ok, latency) per call; latency is None when the call has no comparable duration
+        self._window: Deque[Tuple[bool, Optional[float]]] = deque(maxlen=window_size)
+        self._latencies: Deque[float] = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; half-open admits a few probe calls"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: Optional[float] = None):
+        """Record a completed call; a slow success still counts against the circuit"""
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            if self._current_state() == HALF_OPEN:
+                if latency is not None and latency >= self.slow_call_seconds:
+                    self._trip()
+                else:
+                    # The upstream has recovered; start over with a clean window
+                    self._state = CLOSED
+                    self._window.clear()
+                return
+            self._window.append((True, latency))
+            self._evaluate()
+
+    def record_failure(self, latency: Optional[float] = None):
+        """Record a failed or timed out call"""
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                self._trip()
+                return
+            self._window.append((False, latency))
+            self._evaluate()
+
+    def latency_percentile(self, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """Latency at the given percentile (0-1) of recent successful calls, if enough were seen"""
+        with self._lock:
+            if len(self._latencies) < max(1, min_samples):
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+    def stats(self) -> Dict:
+        """Current state and the rolling window's failure and slow-call rates"""
+        with self._lock:
+            calls = len(self._window)
+            failures = sum(1 for ok, _ in self._window if not ok)
+            slow = sum(1 for _, latency in self._window if latency is not None and latency >= self.slow_call_seconds)
+            return {
+                "state": self._current_state(),
+                "window_calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+                "slow_call_rate": slow / calls if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def _evaluate(self):
+        calls = len(self._window)
+        if self._state != CLOSED or calls < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self._window if not ok)
+        slow = sum(1 for _, latency in self._window if latency is not None and latency >= self.slow_call_seconds)
+        if failures / calls >= self.failure_rate or slow / calls >= self.slow_call_rate:
+            self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        self.times_opened += 1
@@ -0,0 +1,83 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Matches the index's dimension
+EMBEDDING_DIM = 384
+
+# Dense slots for numeric features; categorical features are hashed into the rest
+DIFFICULTY_SLOT = 0
+SCORE_SLOT = 1
+AVERAGE_SCORE_SLOT = 2
+DIAGNOSTIC_SLOT = 3
+HASHED_OFFSET = 8
+
+DIFFICULTY_LEVELS = {"easy": 0.3, "medium": 0.6, "hard": 0.9}
+
+def _normalize(value: str) -> str:
+    return " ".join(str(value).split()).lower()
+
+@lru_cache(maxsize=4096)
+def hashed_feature(token: str) -> Tuple[int, float]:
+    """(column, sign) for a categorical feature; blake2b, so every process and restart agrees"""
+    digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    column = HASHED_OFFSET + digest % (EMBEDDING_DIM - HASHED_OFFSET)
+    # A sign bit keeps colliding features from always adding up
+    return column, 1.0 if digest >> 63 else -1.0
+
+def _embed(records: List[Dict], features) -> np.ndarray:
+    """Scatter every record's (column, value) features into one float32 matrix"""
+    matrix = np.zeros((len(records), EMBEDDING_DIM), dtype=np.float32)
+    rows: List[int] = []
+    columns: List[int] = []
+    values: List[float] = []
+    for row, record in enumerate(records):
+        for column, value in features(record):
+            rows.append(row)
+            columns.append(column)
+            values.append(value)
+    if rows:
+        # add.at, not fancy assignment, so hashed features landing in one column accumulate
+        np.add.at(matrix, (np.array(rows), np.array(columns)), np.array(values, dtype=np.float32))
+    return matrix
+
+def _quiz_features(quiz_data: Dict):
+    if "topic" in quiz_data:
+        yield hashed_feature(f"topic={_normalize(quiz_data['topic'])}")
+    if "difficulty" in quiz_data:
+        difficulty = _normalize(quiz_data["difficulty"])
+        yield DIFFICULTY_SLOT, DIFFICULTY_LEVELS.get(difficulty, 0.5)
+        yield hashed_feature(f"difficulty={difficulty}")
+    if "score" in quiz_data:
+        yield SCORE_SLOT, quiz_data["score"] / 100.0
+    if quiz_data.get("is_diagnostic"):
+        yield DIAGNOSTIC_SLOT, 1.0
+
+def _profile_features(profile_data: Dict):
+    topics = profile_data.get("preferred_topics", [])[:5]
+    for topic in topics:
+        column, sign = hashed_feature(f"topic={_normalize(topic)}")
+        # Spread one unit of weight over the preferred topics, however many there are
+        yield column, sign / len(topics)
+    if "preferred_difficulty" in profile_data:
+        difficulty = _normalize(profile_data["preferred_difficulty"])
+        yield DIFFICULTY_SLOT, DIFFICULTY_LEVELS.get(difficulty, 0.5)
+        yield hashed_feature(f"difficulty={difficulty}")
+    if "average_score" in profile_data:
+        yield AVERAGE_SCORE_SLOT, profile_data["average_score"] / 100.0
+
+def embed_quiz_attempts(records: List[Dict]) -> np.ndarray:
+    """One float32 row per quiz attempt record (topic, difficulty, score, is_diagnostic)"""
+    return _embed(records, _quiz_features)
+
+def embed_profiles(profiles: List[Dict]) -> np.ndarray:
+    """One float32 row per learner profile (preferred_topics, preferred_difficulty, average_score)"""
+    return _embed(profiles, _profile_features)
+
+def embed_quiz_attempt(quiz_data: Dict) -> np.ndarray:
+    return embed_quiz_attempts([quiz_data])[0]
+
+def embed_profile(profile_data: Dict) -> np.ndarray:
+    return embed_profiles([profile_data])[0]
@@ -1,13 +1,36 @@
 import os
 import logging
-from typing import List, Dict, Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
+import threading
+import time
+from typing import TYPE_CHECKING, List, Dict, Optional
+
+from .metrics import REGISTRY
+
+# The Google SDKs are slow to import, so they are loaded on first use
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 logger = logging.getLogger(__name__)
 
+CLASSROOM_CALLS = REGISTRY.counter(
+    "classroom_api_calls", "Google Classroom API calls", ["method", "outcome"])
+CLASSROOM_SECONDS = REGISTRY.histogram(
+    "classroom_api_seconds", "Latency of Google Classroom API calls", ["method"])
+
+def _build_classroom(credentials: Optional["Credentials"], api_endpoint: Optional[str] = None):
+    from googleapiclient.discovery import build
+    if api_endpoint is None:
+        return build('classroom', 'v1', credentials=credentials)
+    if credentials is None:
+        # Stand-in servers do not check tokens
+        from google.auth.credentials import AnonymousCredentials
+        credentials = AnonymousCredentials()
+    return build('classroom', 'v1', credentials=credentials, client_options={"api_endpoint": api_endpoint})
+
+def _flow_from_client_config(client_config: Dict, scopes: List[str]):
+    from google_auth_oauthlib.flow import Flow
+    return Flow.from_client_config(client_config, scopes=scopes)
+
 class GoogleClassroomService:
     def __init__(self):
         self.client_id = os.getenv("GOOGLE_CLIENT_ID")
@@ -17,6 +40,8 @@ class GoogleClassroomService:
             'https://www.googleapis.com/auth/classroom.rosters.readonly',
             'https://www.googleapis.com/auth/classroom.profile.emails'
         ]
+        # Points the API client somewhere other than classroom.googleapis.com, e.g. a local stand-in
+        self.api_endpoint = os.getenv("GOOGLE_CLASSROOM_API_ENDPOINT")
         
         if not all([self.client_id, self.client_secret]):
             logger.warning("Google OAuth credentials not found, using mock data")
@@ -30,7 +55,7 @@ class GoogleClassroomService:
             if not all([self.client_id, self.client_secret]):
                 raise Exception("Google OAuth credentials not configured")
             
-            flow = Flow.from_client_config(
+            flow = _flow_from_client_config(
                 {
                     "web": {
                         "client_id": self.client_id,
@@ -40,7 +65,7 @@ class GoogleClassroomService:
                         "redirect_uris": [redirect_uri]
                     }
                 },
-                scopes=self.scopes
+                self.scopes
             )
             flow.redirect_uri = redirect_uri
             
@@ -55,10 +80,10 @@ class GoogleClassroomService:
             logger.error(f"Error getting authorization URL: {e}")
             raise
 
-    def exchange_code_for_credentials(self, code: str, redirect_uri: str) -> Credentials:
+    def exchange_code_for_credentials(self, code: str, redirect_uri: str) -> "Credentials":
         """Exchange authorization code for credentials"""
         try:
-            flow = Flow.from_client_config(
+            flow = _flow_from_client_config(
                 {
                     "web": {
                         "client_id": self.client_id,
@@ -68,15 +93,15 @@ class GoogleClassroomService:
                         "redirect_uris": [redirect_uri]
                     }
                 },
-                scopes=self.scopes
+                self.scopes
             )
             flow.redirect_uri = redirect_uri
             
-            flow.fetch_token(code=code)
+            self._execute("oauth.fetch_token", lambda: flow.fetch_token(code=code))
             credentials = flow.credentials
             
             # Initialize service
-            self.service = build('classroom', 'v1', credentials=credentials)
+            self.service = _build_classroom(credentials, self.api_endpoint)
             
             return credentials
             
@@ -84,11 +109,24 @@ class GoogleClassroomService:
             logger.error(f"Error exchanging code for credentials: {e}")
             raise
 
-    def get_courses(self, credentials: Optional[Credentials] = None) -> List[Dict]:
+    def _execute(self, method: str, call):
+        """Run one API call, counting it and recording its latency"""
+        started = time.monotonic()
+        try:
+            result = call()
+        except Exception:
+            CLASSROOM_CALLS.labels(method, "error").inc()
+            raise
+        finally:
+            CLASSROOM_SECONDS.labels(method).observe(time.monotonic() - started)
+        CLASSROOM_CALLS.labels(method, "ok").inc()
+        return result
+
+    def get_courses(self, credentials: Optional["Credentials"] = None) -> List[Dict]:
         """Get user's Google Classroom courses"""
         try:
-            if not self.service and credentials:
-                self.service = build('classroom', 'v1', credentials=credentials)
+            if not self.service and (credentials or self.api_endpoint):
+                self.service = _build_classroom(credentials, self.api_endpoint)
             
             if not self.service:
                 # Return mock courses
@@ -117,7 +155,7 @@ class GoogleClassroomService:
                 ]
             
             # Get courses from Google Classroom
-            results = self.service.courses().list(pageSize=50).execute()
+            results = self._execute("courses.list", self.service.courses().list(pageSize=50).execute)
             courses = results.get('courses', [])
             
             return [
@@ -144,11 +182,11 @@ class GoogleClassroomService:
                 }
             ]
 
-    def get_course_students(self, course_id: str, credentials: Optional[Credentials] = None) -> List[Dict]:
+    def get_course_students(self, course_id: str, credentials: Optional["Credentials"] = None) -> List[Dict]:
         """Get students enrolled in a course"""
         try:
-            if not self.service and credentials:
-                self.service = build('classroom', 'v1', credentials=credentials)
+            if not self.service and (credentials or self.api_endpoint):
+                self.service = _build_classroom(credentials, self.api_endpoint)
             
             if not self.service:
                 # Return mock students
@@ -170,7 +208,7 @@ class GoogleClassroomService:
                 ]
             
             # Get students from Google Classroom
-            results = self.service.courses().students().list(courseId=course_id).execute()
+            results = self._execute("courses.students.list", self.service.courses().students().list(courseId=course_id).execute)
             students = results.get('students', [])
             
             return students
@@ -179,7 +217,7 @@ class GoogleClassroomService:
             logger.error(f"Error getting course students: {e}")
             return []
 
-    def sync_classroom_data(self, credentials: Optional[Credentials] = None) -> Dict:
+    def sync_classroom_data(self, credentials: Optional["Credentials"] = None) -> Dict:
         """Sync all classroom data"""
         try:
             courses = self.get_courses(credentials)
@@ -208,5 +246,20 @@ class GoogleClassroomService:
                 "error": str(e)
             }
 
-# Global instance
-google_classroom_service = GoogleClassroomService()
\ No newline at end of file
+_google_classroom_service: Optional[GoogleClassroomService] = None
+_service_lock = threading.Lock()
+
+def get_google_classroom_service() -> GoogleClassroomService:
+    """Return the shared service, constructing it on first use"""
+    global _google_classroom_service
+    if _google_classroom_service is None:
+        with _service_lock:
+            if _google_classroom_service is None:
+                _google_classroom_service = GoogleClassroomService()
+    return _google_classroom_service
+
+def __getattr__(name: str):
+    # Keeps `from ... import google_classroom_service` working without an import-time construction
+    if name == "google_classroom_service":
+        return get_google_classroom_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,112 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Models often leave a comma before a closing bracket; json.loads rejects that
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+class JSONObjectStream:
+    """Incrementally pull complete objects out of a JSON array as its text arrives in chunks"""
+
+    def __init__(self):
+        self._array_started = False
+        self._array_objects = 0
+        self._array_closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._pending: List[str] = []
+        self.recovered = 0
+        self.dropped = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume the next piece of text and return every object completed by it"""
+        objects = []
+        if self._array_closed or not chunk:
+            return objects
+
+        start: Optional[int] = 0 if self._depth > 0 else None
+        for i, ch in enumerate(chunk):
+            if not self._array_started:
+                # Skip any preamble before the array opens
+                if ch == '[':
+                    self._array_started = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._depth == 0:
+                    start = i
+                self._depth += 1
+            elif ch == '}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pending.append(chunk[start:i + 1])
+                    obj = self._decode("".join(self._pending))
+                    self._pending = []
+                    start = None
+                    self._array_objects += 1
+                    if obj is not None:
+                        objects.append(obj)
+            elif ch == ']' and self._depth == 0:
+                if self._array_objects == 0:
+                    # Something like "[5]" in the preamble; keep looking for the real array
+                    self._array_started = False
+                    continue
+                self._array_closed = True
+                break
+
+        if self._depth > 0 and start is not None:
+            self._pending.append(chunk[start:])
+        return objects
+
+    def close(self) -> Dict:
+        """Finish the stream; an object still open at this point was truncated"""
+        if self._depth > 0:
+            self.dropped += 1
+            self._depth = 0
+            self._pending = []
+        return {"recovered": self.recovered, "dropped": self.dropped}
+
+    def _decode(self, text: str) -> Optional[Dict]:
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                obj = json.loads(_TRAILING_COMMA.sub(r'\1', text))
+            except json.JSONDecodeError:
+                self.dropped += 1
+                return None
+        if not isinstance(obj, dict):
+            self.dropped += 1
+            return None
+        self.recovered += 1
+        return obj
+
+def extract_json_objects(text: str) -> Tuple[List[Dict], Dict]:
+    """Salvage every complete object from the first JSON array in text, tolerating preamble and truncation"""
+    parser = JSONObjectStream()
+    objects = parser.feed(text)
+    return objects, parser.close()
+
+def extract_json_value(text: str) -> Any:
+    """Decode the first JSON object or array in text, ignoring code fences and surrounding commentary"""
+    match = re.search(r'[{\[]', text)
+    if not match:
+        raise ValueError("No JSON value found in response")
+    decoder = json.JSONDecoder()
+    try:
+        value, _ = decoder.raw_decode(text, match.start())
+    except json.JSONDecodeError:
+        value, _ = decoder.raw_decode(_TRAILING_COMMA.sub(r'\1', text[match.start():]))
+    return value
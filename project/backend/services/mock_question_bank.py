@@ -0,0 +1,370 @@
+import os
+import json
+import random
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (question, options, correct_answer, explanation)
+MockQuestion = Tuple[str, Tuple[str, ...], int, str]
+
+DEFAULT_TOPIC = "mathematics"
+DEFAULT_DIFFICULTY = "medium"
+
+# Built-in questions; compiled into _BANK at import and not consulted afterwards
+_SEED_QUESTIONS = {
+    "Mathematics": {
+        "easy": [
+            {
+                "question": "What is 15 + 27?",
+                "options": ["40", "42", "44", "46"],
+                "correct_answer": 1,
+                "explanation": "15 + 27 = 42. This is basic addition."
+            },
+            {
+                "question": "What is 8 × 7?",
+                "options": ["54", "56", "58", "60"],
+                "correct_answer": 1,
+                "explanation": "8 × 7 = 56. This is a basic multiplication fact."
+            },
+            {
+                "question": "What is 100 ÷ 4?",
+                "options": ["20", "25", "30", "35"],
+                "correct_answer": 1,
+                "explanation": "100 ÷ 4 = 25. Division is the inverse of multiplication."
+            },
+            {
+                "question": "What is the area of a rectangle with length 6 and width 4?",
+                "options": ["20", "24", "28", "32"],
+                "correct_answer": 1,
+                "explanation": "Area = length × width = 6 × 4 = 24 square units."
+            },
+            {
+                "question": "What is 50% of 80?",
+                "options": ["30", "35", "40", "45"],
+                "correct_answer": 2,
+                "explanation": "50% of 80 = 0.5 × 80 = 40."
+            }
+        ],
+        "medium": [
+            {
+                "question": "What is the derivative of x²?",
+                "options": ["2x", "x²", "2", "x"],
+                "correct_answer": 0,
+                "explanation": "Using the power rule: d/dx(x²) = 2x¹ = 2x"
+            },
+            {
+                "question": "What is the integral of 2x dx?",
+                "options": ["x²", "x² + C", "2", "2x + C"],
+                "correct_answer": 1,
+                "explanation": "∫2x dx = x² + C, where C is the constant of integration"
+            },
+            {
+                "question": "What is the value of sin(π/2)?",
+                "options": ["0", "1", "-1", "π/2"],
+                "correct_answer": 1,
+                "explanation": "sin(π/2) = sin(90°) = 1"
+            },
+            {
+                "question": "Solve for x: 2x + 5 = 13",
+                "options": ["x = 4", "x = 6", "x = 8", "x = 9"],
+                "correct_answer": 0,
+                "explanation": "2x = 13 - 5 = 8, so x = 4"
+            },
+            {
+                "question": "What is the area of a circle with radius 3?",
+                "options": ["6π", "9π", "12π", "18π"],
+                "correct_answer": 1,
+                "explanation": "Area = πr² = π(3)² = 9π"
+            }
+        ],
+        "hard": [
+            {
+                "question": "What is the limit of (sin x)/x as x approaches 0?",
+                "options": ["0", "1", "∞", "undefined"],
+                "correct_answer": 1,
+                "explanation": "This is a fundamental limit: lim(x→0) (sin x)/x = 1"
+            },
+            {
+                "question": "What is the Taylor series expansion of e^x around x = 0?",
+                "options": ["1 + x + x²/2! + x³/3! + ...", "x + x²/2 + x³/3 + ...", "1 + x + x² + x³ + ...", "x + x² + x³ + ..."],
+                "correct_answer": 0,
+                "explanation": "The Taylor series for e^x is: e^x = Σ(x^n/n!) = 1 + x + x²/2! + x³/3! + ..."
+            },
+            {
+                "question": "What is the eigenvalue equation for a matrix A?",
+                "options": ["Av = λv", "A + v = λv", "Av = v + λ", "A - v = λ"],
+                "correct_answer": 0,
+                "explanation": "The eigenvalue equation is Av = λv, where λ is the eigenvalue and v is the eigenvector"
+            }
+        ]
+    },
+    "Physics": {
+        "easy": [
+            {
+                "question": "What is the unit of force?",
+                "options": ["Joule", "Newton", "Watt", "Pascal"],
+                "correct_answer": 1,
+                "explanation": "The Newton (N) is the SI unit of force, named after Isaac Newton."
+            },
+            {
+                "question": "What is the speed of light in vacuum?",
+                "options": ["3 × 10⁸ m/s", "3 × 10⁶ m/s", "3 × 10¹⁰ m/s", "3 × 10⁴ m/s"],
+                "correct_answer": 0,
+                "explanation": "The speed of light in vacuum is approximately 3 × 10⁸ meters per second"
+            },
+            {
+                "question": "What happens to an object in free fall (ignoring air resistance)?",
+                "options": ["It accelerates upward", "It moves at constant speed", "It accelerates downward", "It decelerates"],
+                "correct_answer": 2,
+                "explanation": "Objects in free fall accelerate downward due to gravity at approximately 9.8 m/s²"
+            }
+        ],
+        "medium": [
+            {
+                "question": "What is Newton's second law of motion?",
+                "options": ["F = ma", "E = mc²", "v = u + at", "s = ut + ½at²"],
+                "correct_answer": 0,
+                "explanation": "Newton's second law states that Force equals mass times acceleration"
+            },
+            {
+                "question": "What is the unit of electric current?",
+                "options": ["Volt", "Ampere", "Ohm", "Watt"],
+                "correct_answer": 1,
+                "explanation": "The ampere (A) is the SI unit of electric current"
+            },
+            {
+                "question": "What happens to kinetic energy when velocity doubles?",
+                "options": ["Doubles", "Triples", "Quadruples", "Remains same"],
+                "correct_answer": 2,
+                "explanation": "KE = ½mv², so when v doubles, KE increases by a factor of 4"
+            }
+        ],
+        "hard": [
+            {
+                "question": "What is the Schrödinger equation in quantum mechanics?",
+                "options": ["iℏ ∂ψ/∂t = Ĥψ", "E = mc²", "F = ma", "∇²φ = 0"],
+                "correct_answer": 0,
+                "explanation": "The time-dependent Schrödinger equation is iℏ ∂ψ/∂t = Ĥψ, where ψ is the wave function"
+            },
+            {
+                "question": "What is the uncertainty principle?",
+                "options": ["ΔxΔp ≥ ℏ/2", "E = hf", "λ = h/p", "F = qE"],
+                "correct_answer": 0,
+                "explanation": "Heisenberg's uncertainty principle states that ΔxΔp ≥ ℏ/2, where Δx and Δp are uncertainties in position and momentum"
+            }
+        ]
+    },
+    "Chemistry": {
+        "easy": [
+            {
+                "question": "What is the chemical formula for water?",
+                "options": ["H₂O", "CO₂", "NaCl", "O₂"],
+                "correct_answer": 0,
+                "explanation": "Water consists of two hydrogen atoms bonded to one oxygen atom"
+            },
+            {
+                "question": "What is the atomic number of carbon?",
+                "options": ["6", "12", "14", "8"],
+                "correct_answer": 0,
+                "explanation": "Carbon has 6 protons, giving it an atomic number of 6"
+            },
+            {
+                "question": "What is the pH of pure water?",
+                "options": ["0", "7", "14", "1"],
+                "correct_answer": 1,
+                "explanation": "Pure water has a neutral pH of 7"
+            }
+        ],
+        "medium": [
+            {
+                "question": "What type of bond forms between Na and Cl?",
+                "options": ["Covalent", "Ionic", "Metallic", "Hydrogen"],
+                "correct_answer": 1,
+                "explanation": "Sodium and chlorine form an ionic bond due to electron transfer"
+            },
+            {
+                "question": "What is Avogadro's number?",
+                "options": ["6.02 × 10²³", "3.14 × 10⁸", "9.81 × 10²", "1.38 × 10²³"],
+                "correct_answer": 0,
+                "explanation": "Avogadro's number is approximately 6.02 × 10²³ particles per mole"
+            }
+        ],
+        "hard": [
+            {
+                "question": "What is the molecular orbital theory?",
+                "options": ["Electrons occupy molecular orbitals formed by combining atomic orbitals", "Atoms share electrons equally", "Electrons transfer completely", "Atoms form ionic bonds"],
+                "correct_answer": 0,
+                "explanation": "Molecular orbital theory describes how atomic orbitals combine to form molecular orbitals that can hold electrons"
+            }
+        ]
+    },
+    "Biology": {
+        "easy": [
+            {
+                "question": "What is the powerhouse of the cell?",
+                "options": ["Nucleus", "Mitochondria", "Ribosome", "Golgi apparatus"],
+                "correct_answer": 1,
+                "explanation": "Mitochondria produce ATP, the cell's energy currency"
+            },
+            {
+                "question": "What is the process by which plants make food?",
+                "options": ["Respiration", "Photosynthesis", "Digestion", "Fermentation"],
+                "correct_answer": 1,
+                "explanation": "Photosynthesis converts light energy into chemical energy"
+            }
+        ],
+        "medium": [
+            {
+                "question": "What is DNA replication?",
+                "options": ["Copying DNA", "Breaking down DNA", "Translating DNA", "Transcribing DNA"],
+                "correct_answer": 0,
+                "explanation": "DNA replication is the process of copying DNA to produce identical DNA molecules"
+            }
+        ],
+        "hard": [
+            {
+                "question": "What is the central dogma of molecular biology?",
+                "options": ["DNA → RNA → Protein", "Protein → RNA → DNA", "RNA → DNA → Protein", "DNA → Protein → RNA"],
+                "correct_answer": 0,
+                "explanation": "The central dogma describes the flow of genetic information: DNA is transcribed to RNA, which is translated to protein"
+            }
+        ]
+    },
+    "Computer Science": {
+        "easy": [
+            {
+                "question": "What does CPU stand for?",
+                "options": ["Central Processing Unit", "Computer Personal Unit", "Central Program Unit", "Computer Processing Unit"],
+                "correct_answer": 0,
+                "explanation": "CPU stands for Central Processing Unit, the brain of the computer"
+            },
+            {
+                "question": "What is binary code?",
+                "options": ["Code using 0s and 1s", "Code using letters", "Code using numbers 0-9", "Code using symbols"],
+                "correct_answer": 0,
+                "explanation": "Binary code uses only two digits: 0 and 1, representing off and on states"
+            }
+        ],
+        "medium": [
+            {
+                "question": "Which data structure follows LIFO principle?",
+                "options": ["Queue", "Stack", "Array", "Linked List"],
+                "correct_answer": 1,
+                "explanation": "Stack follows Last In, First Out (LIFO) principle"
+            },
+            {
+                "question": "What is the time complexity of binary search?",
+                "options": ["O(n)", "O(log n)", "O(n²)", "O(1)"],
+                "correct_answer": 1,
+                "explanation": "Binary search has O(log n) time complexity as it halves the search space each iteration"
+            }
+        ],
+        "hard": [
+            {
+                "question": "What is the difference between P and NP problems?",
+                "options": ["P problems can be solved in polynomial time, NP problems can be verified in polynomial time", "P problems are harder than NP", "NP problems are easier than P", "There is no difference"],
+                "correct_answer": 0,
+                "explanation": "P problems can be solved in polynomial time, while NP problems can be verified (but not necessarily solved) in polynomial time"
+            }
+        ]
+    }
+}
+
+# (topic, difficulty) -> questions, both keys lower-cased
+_BANK: Dict[Tuple[str, str], Tuple[MockQuestion, ...]] = {}
+# topic -> every question for that topic, used when one difficulty runs dry
+_BY_TOPIC: Dict[str, Tuple[MockQuestion, ...]] = {}
+_bank_lock = threading.Lock()
+
+_seed = os.getenv("MOCK_QUESTION_SEED")
+_rng = random.Random(int(_seed) if _seed is not None else None)
+
+def _normalize(value: str) -> str:
+    return " ".join(value.split()).lower()
+
+def _compile(raw: Dict) -> Dict[Tuple[str, str], List[MockQuestion]]:
+    """Convert {topic: {difficulty: [question dict]}} into validated tuples"""
+    compiled: Dict[Tuple[str, str], List[MockQuestion]] = {}
+    for topic, difficulties in raw.items():
+        for difficulty, questions in difficulties.items():
+            entries = compiled.setdefault((_normalize(topic), _normalize(difficulty)), [])
+            for q in questions:
+                options = q.get("options")
+                answer = q.get("correct_answer")
+                if not q.get("question") or not isinstance(options, list) or len(options) != 4:
+                    continue
+                if not isinstance(answer, int) or answer not in (0, 1, 2, 3):
+                    continue
+                entries.append((q["question"], tuple(options), answer, q.get("explanation", "")))
+    return compiled
+
+def _merge(compiled: Dict[Tuple[str, str], List[MockQuestion]]) -> int:
+    """Add compiled questions to the bank, skipping stems it already holds"""
+    added = 0
+    with _bank_lock:
+        for key, entries in compiled.items():
+            existing = _BANK.get(key, ())
+            seen = {q[0] for q in existing}
+            fresh = tuple(q for q in entries if q[0] not in seen)
+            if not fresh:
+                continue
+            # Replace whole tuples so readers never see a half-updated entry
+            _BANK[key] = existing + fresh
+            _BY_TOPIC[key[0]] = _BY_TOPIC.get(key[0], ()) + fresh
+            added += len(fresh)
+    return added
+
+def load_mock_bank(path: str) -> int:
+    """Extend the bank from a JSON file shaped like {topic: {difficulty: [question, ...]}}"""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    added = _merge(_compile(raw))
+    logger.info(f"Loaded {added} mock questions from {path}")
+    return added
+
+def sample_mock_questions(topic: str, difficulty: str, num_questions: int,
+                          seed: Optional[int] = None) -> List[Dict]:
+    """Draw num_questions distinct mock questions, repeating only once the topic is exhausted"""
+    rng = random.Random(seed) if seed is not None else _rng
+    topic_key = _normalize(topic)
+    if topic_key not in _BY_TOPIC:
+        topic_key = DEFAULT_TOPIC
+    pool = _BANK.get((topic_key, _normalize(difficulty))) or _BANK.get((topic_key, DEFAULT_DIFFICULTY), ())
+
+    if num_questions <= len(pool):
+        picks = rng.sample(pool, num_questions)
+    else:
+        # Borrow the topic's other difficulties before repeating anything
+        picks = rng.sample(pool, len(pool))
+        used = set(picks)
+        others = [q for q in _BY_TOPIC[topic_key] if q not in used]
+        picks += rng.sample(others, min(len(others), num_questions - len(picks)))
+        everything = _BY_TOPIC[topic_key]
+        while len(picks) < num_questions:
+            picks += rng.sample(everything, min(len(everything), num_questions - len(picks)))
+
+    return [
+        {
+            "question": question,
+            "options": list(options),
+            "correct_answer": answer,
+            "explanation": explanation
+        }
+        for question, options, answer, explanation in picks
+    ]
+
+def bank_size() -> Dict[str, int]:
+    """Number of mock questions per topic/difficulty"""
+    return {f"{topic}/{difficulty}": len(questions) for (topic, difficulty), questions in _BANK.items()}
+
+_merge(_compile(_SEED_QUESTIONS))
+del _SEED_QUESTIONS
+
+if os.getenv("MOCK_QUESTION_BANK_PATH"):
+    try:
+        load_mock_bank(os.environ["MOCK_QUESTION_BANK_PATH"])
+    except Exception as e:
+        logger.error(f"Failed to load mock question bank: {e}")
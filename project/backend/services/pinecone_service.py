@@ -1,15 +1,28 @@
 import os
 import logging
-from typing import List, Dict, Optional
+import threading
+import time
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import json
 
+from .metrics import REGISTRY
+from .write_behind import WriteBehindQueue
+
 logger = logging.getLogger(__name__)
 
+PINECONE_SECONDS = REGISTRY.histogram(
+    "pinecone_request_seconds", "Latency of Pinecone index operations", ["operation", "outcome"])
+
+# Pinecone's recommended ceiling for vectors per upsert request
+UPSERT_BATCH_SIZE = 100
+
 class PineconeService:
     def __init__(self):
         self.api_key = os.getenv("PINECONE_API_KEY")
         self.index_name = os.getenv("PINECONE_INDEX_NAME", "edututorai")
+        # Data-plane host override, e.g. a local stand-in server for load tests
+        self.host = os.getenv("PINECONE_HOST")
         
         if not self.api_key:
             logger.warning("Pinecone API key not found, using mock storage")
@@ -30,7 +43,17 @@ class PineconeService:
                 
                 # Initialize Pinecone with new API
                 pc = Pinecone(api_key=self.api_key)
-                self.index = pc.Index(self.index_name)
+                self.index = pc.Index(self.index_name, host=self.host) if self.host else pc.Index(self.index_name)
+                
+                # Attempt vectors are buffered and upserted in batches off the request path
+                self.attempt_writes = WriteBehindQueue(
+                    "pinecone_attempts",
+                    self._upsert_attempts,
+                    max_batch=int(os.getenv("PINECONE_WRITE_BATCH", str(UPSERT_BATCH_SIZE))),
+                    max_delay=float(os.getenv("PINECONE_WRITE_MAX_DELAY", "0.5")),
+                    capacity=int(os.getenv("PINECONE_WRITE_QUEUE_SIZE", "10000")),
+                    max_retries=int(os.getenv("PINECONE_WRITE_RETRIES", "5"))
+                )
                 logger.info("✅ Pinecone initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Pinecone: {e}")
@@ -43,6 +66,17 @@ class PineconeService:
                     "adaptive_data": {}
                 }
 
+    def _timed(self, operation: str, call, **kwargs):
+        """Run one index operation, recording its latency and outcome"""
+        started = time.monotonic()
+        try:
+            result = call(**kwargs)
+        except Exception:
+            PINECONE_SECONDS.labels(operation, "error").observe(time.monotonic() - started)
+            raise
+        PINECONE_SECONDS.labels(operation, "ok").observe(time.monotonic() - started)
+        return result
+
     def store_user_profile(self, user_id: str, profile_data: Dict) -> bool:
         """Store user profile with embeddings"""
         try:
@@ -51,9 +85,7 @@ class PineconeService:
                 embedding = self._generate_profile_embedding(profile_data)
                 
                 # Upsert to Pinecone
-                self.index.upsert(
-                    vectors=[(user_id, embedding, profile_data)]
-                )
+                self._timed("upsert", self.index.upsert, vectors=[(user_id, embedding, profile_data)])
                 return True
             else:
                 # Mock storage
@@ -70,13 +102,8 @@ class PineconeService:
             attempt_id = f"{user_id}_{datetime.now().timestamp()}"
             
             if self.index:
-                # Generate embedding for quiz content
-                embedding = self._generate_quiz_embedding(quiz_data)
-                
-                # Upsert to Pinecone
-                self.index.upsert(
-                    vectors=[(attempt_id, embedding, quiz_data)]
-                )
+                # Queued for the next batched upsert; the embedding is built on the flush thread
+                self.attempt_writes.put((attempt_id, quiz_data))
                 return True
             else:
                 # Enhanced mock storage
@@ -92,6 +119,43 @@ class PineconeService:
             logger.error(f"Error storing quiz attempt: {e}")
             return False
 
+    def store_quiz_attempts(self, attempts: List[Tuple[str, Dict]]) -> bool:
+        """Store many (attempt_id, quiz_data) records through the write-behind queue"""
+        try:
+            if self.index:
+                self.attempt_writes.put_many(attempts)
+                return True
+            else:
+                for _, quiz_data in attempts:
+                    user_id = quiz_data["user_id"]
+                    self.mock_storage["quiz_history"].setdefault(user_id, []).append(quiz_data)
+                    self._update_learning_patterns(user_id, quiz_data)
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error storing quiz attempts: {e}")
+            return False
+
+    def _upsert_attempts(self, attempts: List[Tuple[str, Dict]]):
+        """Embed and upsert one batch of attempts; raising lets the queue retry it"""
+        # Imported here, like the embedding helpers below: embeddings pulls in numpy, which
+        # a backend without Pinecone configured never needs at startup
+        from .embeddings import embed_quiz_attempts
+        
+        # One vectorized call embeds the whole batch
+        embeddings = embed_quiz_attempts([quiz_data for _, quiz_data in attempts]).tolist()
+        vectors = [
+            (attempt_id, embedding, quiz_data)
+            for (attempt_id, quiz_data), embedding in zip(attempts, embeddings)
+        ]
+        for start in range(0, len(vectors), UPSERT_BATCH_SIZE):
+            self._timed("upsert", self.index.upsert, vectors=vectors[start:start + UPSERT_BATCH_SIZE])
+
+    def shutdown(self):
+        """Flush buffered attempt vectors"""
+        if self.index:
+            self.attempt_writes.close()
+
     def _update_learning_patterns(self, user_id: str, quiz_data: Dict):
         """Update learning patterns for adaptive recommendations"""
         if user_id not in self.mock_storage["learning_patterns"]:
@@ -197,7 +261,8 @@ class PineconeService:
                 
                 # Generate embedding and query for similar users
                 embedding = self._generate_profile_embedding(user_profile)
-                results = self.index.query(
+                results = self._timed(
+                    "query", self.index.query,
                     vector=embedding,
                     top_k=top_k,
                     include_metadata=True
@@ -400,39 +465,13 @@ class PineconeService:
 
     def _generate_profile_embedding(self, profile_data: Dict) -> List[float]:
         """Generate embedding for user profile"""
-        # In a real implementation, this would use a proper embedding model
-        # For now, return a mock embedding based on profile characteristics
-        
-        # Create a simple embedding based on learning preferences
-        embedding = [0.0] * 384  # Mock 384-dimensional embedding
-        
-        # Encode some basic features
-        if "preferred_topics" in profile_data:
-            for i, topic in enumerate(profile_data["preferred_topics"][:5]):
-                embedding[i] = hash(topic) % 100 / 100.0
-        
-        if "average_score" in profile_data:
-            embedding[10] = profile_data["average_score"] / 100.0
-        
-        return embedding
+        from .embeddings import embed_profile
+        return embed_profile(profile_data).tolist()
 
     def _generate_quiz_embedding(self, quiz_data: Dict) -> List[float]:
         """Generate embedding for quiz data"""
-        # Mock embedding generation
-        embedding = [0.0] * 384
-        
-        # Encode quiz features
-        if "topic" in quiz_data:
-            embedding[0] = hash(quiz_data["topic"]) % 100 / 100.0
-        
-        if "difficulty" in quiz_data:
-            difficulty_map = {"easy": 0.3, "medium": 0.6, "hard": 0.9}
-            embedding[1] = difficulty_map.get(quiz_data["difficulty"], 0.5)
-        
-        if "score" in quiz_data:
-            embedding[2] = quiz_data["score"] / 100.0
-        
-        return embedding
+        from .embeddings import embed_quiz_attempt
+        return embed_quiz_attempt(quiz_data).tolist()
 
     def _get_user_profile(self, user_id: str) -> Optional[Dict]:
         """Get user profile from storage"""
@@ -442,5 +481,25 @@ class PineconeService:
         else:
             return self.mock_storage["user_profiles"].get(user_id)
 
-# Global instance
-pinecone_service = PineconeService()
\ No newline at end of file
+_pinecone_service: Optional[PineconeService] = None
+_service_lock = threading.Lock()
+
+def get_pinecone_service() -> PineconeService:
+    """Return the shared service, constructing it (and importing the SDK) on first use"""
+    global _pinecone_service
+    if _pinecone_service is None:
+        with _service_lock:
+            if _pinecone_service is None:
+                _pinecone_service = PineconeService()
+    return _pinecone_service
+
+def shutdown_pinecone_service():
+    """Flush the shared service's pending writes if it was ever constructed"""
+    if _pinecone_service is not None:
+        _pinecone_service.shutdown()
+
+def __getattr__(name: str):
+    # Keeps `from ... import pinecone_service` working without an import-time construction
+    if name == "pinecone_service":
+        return get_pinecone_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,96 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .quiz_records import QUESTION_STORE, QuestionStore
+
+CacheKey = Tuple[str, str, int, str, str]
+
+class QuestionCache:
+    """Thread-safe LRU cache with time-based expiry for generated quiz questions"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 900, store: QuestionStore = QUESTION_STORE):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        # Entries hold references into the shared question store rather than their own question dicts
+        self._entries: "OrderedDict[CacheKey, Tuple[float, array]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(topic: str, difficulty: str, num_questions: int, model_id: str, prompt_version: str) -> CacheKey:
+        """Build a cache key that ignores case and whitespace differences in the request"""
+        return (
+            " ".join(topic.split()).lower(),
+            difficulty.strip().lower(),
+            int(num_questions),
+            model_id,
+            prompt_version
+        )
+
+    def get(self, key: CacheKey) -> Optional[List[Dict]]:
+        """Return a private copy of the cached questions, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, refs = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.store.release_all(refs)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Fresh dicts, since callers mutate questions (e.g. assigning ids); built under the lock
+            # so an eviction cannot release the references first
+            return [self.store.as_dict(ref) for ref in refs]
+
+    def put(self, key: CacheKey, questions: List[Dict]):
+        """Store questions, evicting the least recently used entries when full"""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+
+        entry = (time.monotonic() + self.ttl_seconds, self.store.add_all(questions))
+        with self._lock:
+            replaced = self._entries.get(key)
+            if replaced is not None:
+                self.store.release_all(replaced[1])
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, (_, refs) = self._entries.popitem(last=False)
+                self.store.release_all(refs)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            for _, refs in self._entries.values():
+                self.store.release_all(refs)
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
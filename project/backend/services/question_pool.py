@@ -0,0 +1,190 @@
+import os
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .quiz_records import QUESTION_STORE
+from .watsonx_service import get_watsonx_service, WatsonxService
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str]
+
+class QuestionPool:
+    """Warm pool of pre-generated questions per (topic, difficulty), refilled in the background"""
+
+    def __init__(self, service: WatsonxService):
+        self.service = service
+        self.topics = [t.strip() for t in os.getenv(
+            "QUESTION_POOL_TOPICS", "Mathematics,Physics,Chemistry,Biology,Computer Science"
+        ).split(",") if t.strip()]
+        self.difficulties = [d.strip() for d in os.getenv(
+            "QUESTION_POOL_DIFFICULTIES", "easy,medium,hard"
+        ).split(",") if d.strip()]
+        self.target_size = int(os.getenv("QUESTION_POOL_SIZE", "20"))
+        self.low_water = int(os.getenv("QUESTION_POOL_LOW_WATER", "8"))
+        self.refill_batch = int(os.getenv("QUESTION_POOL_REFILL_BATCH", "5"))
+        self.refill_interval = float(os.getenv("QUESTION_POOL_REFILL_INTERVAL", "1.0"))
+        self.num_workers = int(os.getenv("QUESTION_POOL_WORKERS", "2"))
+
+        # Pools hold references into the shared question store, not question dicts
+        self._pools: Dict[PoolKey, Deque[int]] = {
+            self._key(topic, difficulty): deque()
+            for topic in self.topics
+            for difficulty in self.difficulties
+        }
+        self._lock = threading.Lock()
+        self._refill_queue: "queue.Queue[PoolKey]" = queue.Queue()
+        self._scheduled: Set[PoolKey] = set()
+        self._stop = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.questions_served = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self._refill_log: Deque[Tuple[float, int]] = deque()
+
+    @staticmethod
+    def _key(topic: str, difficulty: str) -> PoolKey:
+        return (" ".join(topic.split()).lower(), difficulty.strip().lower())
+
+    def start(self):
+        """Start the refill workers and schedule an initial fill of every pool"""
+        if self._workers:
+            return
+
+        self._stop.clear()
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._refill_worker, name=f"question-pool-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        for key in self._pools:
+            self._schedule_refill(key)
+        logger.info(f"Question pool warming {len(self._pools)} topic/difficulty pools")
+
+    def stop(self):
+        """Stop the refill workers"""
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+
+    def take(self, topic: str, difficulty: str, num_questions: int) -> Optional[List[Dict]]:
+        """Remove and return num_questions pooled questions, or None if the pool cannot cover the request"""
+        key = self._key(topic, difficulty)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or len(pool) < num_questions:
+                self.misses += 1
+                questions = None
+            else:
+                refs = [pool.popleft() for _ in range(num_questions)]
+                questions = [QUESTION_STORE.as_dict(ref) for ref in refs]
+                QUESTION_STORE.release_all(refs)
+                self.hits += 1
+                self.questions_served += num_questions
+            needs_refill = pool is not None and len(pool) < self.low_water
+
+        if needs_refill:
+            self._schedule_refill(key)
+        return questions
+
+    def stats(self) -> Dict:
+        """Pool sizes, hit ratio and recent refill rate"""
+        with self._lock:
+            now = time.monotonic()
+            while self._refill_log and self._refill_log[0][0] < now - 60:
+                self._refill_log.popleft()
+            lookups = self.hits + self.misses
+            return {
+                "pools": {f"{topic}/{difficulty}": len(pool) for (topic, difficulty), pool in self._pools.items()},
+                "total_questions": sum(len(pool) for pool in self._pools.values()),
+                "target_size": self.target_size,
+                "low_water": self.low_water,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "questions_served": self.questions_served,
+                "refills": self.refills,
+                "refill_failures": self.refill_failures,
+                "refill_rate_per_minute": sum(count for _, count in self._refill_log),
+                "pending_refills": len(self._scheduled),
+                "running": bool(self._workers)
+            }
+
+    def _schedule_refill(self, key: PoolKey):
+        with self._lock:
+            if key in self._scheduled:
+                return
+            self._scheduled.add(key)
+        self._refill_queue.put(key)
+
+    def _refill_worker(self):
+        while not self._stop.is_set():
+            try:
+                key = self._refill_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                self._refill(key)
+            finally:
+                with self._lock:
+                    self._scheduled.discard(key)
+                    below_target = len(self._pools[key]) < self.target_size
+                # Keep topping up in small steps so every pool gets a turn
+                if below_target and not self._stop.is_set():
+                    self._schedule_refill(key)
+
+            # Refill rate limit, so warming never starves live requests of LLM capacity
+            self._stop.wait(self.refill_interval)
+
+    def _refill(self, key: PoolKey):
+        topic, difficulty = key
+        with self._lock:
+            missing = self.target_size - len(self._pools[key])
+            known = {QUESTION_STORE.get(ref)[0].strip().lower() for ref in self._pools[key]}
+        if missing <= 0:
+            return
+
+        try:
+            generated = self.service.generate_fresh_questions(topic, difficulty, min(missing, self.refill_batch))
+        except Exception as e:
+            with self._lock:
+                self.refill_failures += 1
+            logger.warning(f"Question pool refill for {topic}/{difficulty} failed: {e}")
+            # Back off instead of hammering a failing upstream
+            self._stop.wait(self.refill_interval * 5)
+            return
+
+        fresh = [q for q in generated if q["question"].strip().lower() not in known]
+        with self._lock:
+            self._pools[key].extend(QUESTION_STORE.add_all(fresh[:max(0, self.target_size - len(self._pools[key]))]))
+            self.refills += 1
+            self._refill_log.append((time.monotonic(), len(fresh)))
+
+_question_pool: Optional[QuestionPool] = None
+_pool_lock = threading.Lock()
+
+def get_question_pool() -> QuestionPool:
+    """Return the shared pool, constructing it on first use"""
+    global _question_pool
+    if _question_pool is None:
+        with _pool_lock:
+            if _question_pool is None:
+                service = get_watsonx_service()
+                _question_pool = QuestionPool(service)
+                # Serve pooled questions while the model's circuit is open, before resorting to mocks
+                service.set_fallback_provider(_question_pool.take)
+    return _question_pool
+
+def stop_question_pool():
+    """Stop the shared pool's workers if it was ever constructed"""
+    if _question_pool is not None:
+        _question_pool.stop()
@@ -0,0 +1,145 @@
+import sys
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# (question, options, correct_answer, explanation); the tuple shape mock_question_bank uses
+StoredQuestion = Tuple[str, Tuple[str, ...], int, Optional[str]]
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class QuestionStore:
+    """Deduplicated, reference-counted question texts shared by every quiz, cache entry and pool slot in the process"""
+
+    def __init__(self):
+        self._questions: Dict[int, StoredQuestion] = {}
+        self._ids: Dict[StoredQuestion, int] = {}
+        self._refs: Dict[int, int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, question: Dict) -> int:
+        """Take a reference to question, storing it only if no identical question is held yet"""
+        # Option strings repeat across unrelated questions ("True", "None of the above"), so share them too
+        entry = (
+            question["question"],
+            tuple(_intern(option) for option in question["options"]),
+            question["correct_answer"],
+            question.get("explanation")
+        )
+        with self._lock:
+            ref = self._ids.get(entry)
+            if ref is None:
+                ref = self._next_id
+                self._next_id += 1
+                self._questions[ref] = entry
+                self._ids[entry] = ref
+                self._refs[ref] = 0
+            self._refs[ref] += 1
+        return ref
+
+    def add_all(self, questions: List[Dict]) -> array:
+        return array("I", [self.add(question) for question in questions])
+
+    def get(self, ref: int) -> StoredQuestion:
+        return self._questions[ref]
+
+    def as_dict(self, ref: int) -> Dict:
+        """A fresh question dict that callers are free to mutate"""
+        question, options, answer, explanation = self._questions[ref]
+        return {
+            "question": question,
+            "options": list(options),
+            "correct_answer": answer,
+            "explanation": explanation
+        }
+
+    def release(self, ref: int):
+        """Drop one reference, forgetting the question once nothing refers to it"""
+        with self._lock:
+            self._refs[ref] -= 1
+            if self._refs[ref] == 0:
+                del self._refs[ref]
+                del self._ids[self._questions.pop(ref)]
+
+    def release_all(self, refs):
+        for ref in refs:
+            self.release(ref)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"questions": len(self._questions), "references": sum(self._refs.values())}
+
+# One store per process, so the same question held by a quiz, the cache and the pool is kept once
+QUESTION_STORE = QuestionStore()
+
+# Marks a field the stored quiz did not have, so to_dict leaves it out again
+_ABSENT = object()
+
+# Quiz fields kept in slots; anything else a caller stores rides along in `extra`
+_SCALAR_FIELDS = ("id", "title", "topic", "difficulty", "time_limit", "created_at", "is_diagnostic")
+_INTERNED_FIELDS = ("title", "topic", "difficulty")
+_QUESTION_FIELDS = ("id", "question", "options", "correct_answer", "explanation")
+
+def _question_overlay(question: Dict) -> Optional[Dict]:
+    """What the question store cannot reproduce for question: extra keys, and a missing explanation"""
+    overlay = {key: value for key, value in question.items() if key not in _QUESTION_FIELDS}
+    if "explanation" not in question:
+        overlay["explanation"] = _ABSENT
+    return overlay or None
+
+class CompactQuiz:
+    """A quiz held in memory: slotted scalar fields plus an array of question references
+
+    to_dict returns exactly what from_dict was given, as the SQLite backend does: fields
+    the quiz lacked stay absent and fields this class does not know are kept in `extra`.
+    """
+
+    __slots__ = _SCALAR_FIELDS + ("extra", "question_ids", "question_overlays", "question_refs")
+
+    @classmethod
+    def from_dict(cls, quiz: Dict, store: QuestionStore = QUESTION_STORE) -> "CompactQuiz":
+        record = cls()
+        for field in _SCALAR_FIELDS:
+            value = quiz.get(field, _ABSENT)
+            # Titles, topics and difficulties come from a small vocabulary
+            setattr(record, field, _intern(value) if field in _INTERNED_FIELDS else value)
+        record.extra = {key: value for key, value in quiz.items()
+                        if key not in _SCALAR_FIELDS and key != "questions"} or None
+
+        questions = quiz["questions"]
+        # Positional question ids ("q_1", ...) come from a small vocabulary too; quizzes saved
+        # straight from generation have none, so the tuples are only kept when needed
+        question_ids = tuple(_intern(q.get("id")) for q in questions)
+        record.question_ids = question_ids if any(qid is not None for qid in question_ids) else None
+        overlays = tuple(_question_overlay(q) for q in questions)
+        record.question_overlays = overlays if any(overlays) else None
+        record.question_refs = store.add_all(questions)
+        return record
+
+    def _question(self, index: int, ref: int, store: QuestionStore) -> Dict:
+        question = store.as_dict(ref)
+        if self.question_ids is not None and self.question_ids[index] is not None:
+            question = {"id": self.question_ids[index], **question}
+        overlay = self.question_overlays[index] if self.question_overlays is not None else None
+        if overlay:
+            for key, value in overlay.items():
+                if value is _ABSENT:
+                    question.pop(key, None)
+                else:
+                    question[key] = value
+        return question
+
+    def to_dict(self, store: QuestionStore = QUESTION_STORE) -> Dict:
+        """The quiz as it was saved, in the JSON shape of the Quiz API model"""
+        quiz = {field: getattr(self, field) for field in _SCALAR_FIELDS if getattr(self, field) is not _ABSENT}
+        quiz["questions"] = [self._question(index, ref, store) for index, ref in enumerate(self.question_refs)]
+        if self.extra:
+            quiz.update(self.extra)
+        return quiz
+
+    def release(self, store: QuestionStore = QUESTION_STORE):
+        """Give back this quiz's question references; call once when the record is discarded"""
+        store.release_all(self.question_refs)
+        self.question_refs = array("I")
@@ -0,0 +1,46 @@
+from typing import Dict, List
+
+import numpy as np
+
+# Marks a missing answer; never equal to a real option index
+UNANSWERED = -1
+
+# Answers are packed into int64; anything outside this range cannot be stored in the matrix
+_INT64 = np.iinfo(np.int64)
+
+def answers_in_range(answers: List[int]) -> bool:
+    """Whether every answer fits the answer matrix, so one bad sheet can be rejected on its own"""
+    return all(_INT64.min <= answer <= _INT64.max for answer in answers)
+
+def answer_key(quiz: Dict) -> np.ndarray:
+    """A quiz's correct option indexes as one integer array"""
+    return np.fromiter((q["correct_answer"] for q in quiz["questions"]), dtype=np.int64, count=len(quiz["questions"]))
+
+def answer_matrix(answer_sheets: List[List[int]], num_questions: int) -> np.ndarray:
+    """Pack answer sheets into a rows x questions array; extra answers are dropped, missing ones are UNANSWERED"""
+    matrix = np.full((len(answer_sheets), num_questions), UNANSWERED, dtype=np.int64)
+    for row, answers in enumerate(answer_sheets):
+        answers = answers[:num_questions]
+        matrix[row, :len(answers)] = answers
+    return matrix
+
+def score_answer_sheets(key: np.ndarray, answer_sheets: List[List[int]]) -> np.ndarray:
+    """Percentage scores for many sheets against one key, in the same float arithmetic as the per-attempt path"""
+    if len(key) == 0:
+        return np.zeros(len(answer_sheets), dtype=np.int64)
+    correct = (answer_matrix(answer_sheets, len(key)) == key).sum(axis=1)
+    return (correct / len(key) * 100).astype(np.int64)
+
+def score_submissions(quizzes: Dict[str, Dict], submissions: List[Dict]) -> List[int]:
+    """Score submissions ({quiz_id, answers}) for any mix of quizzes, one vectorized pass per distinct quiz"""
+    scores = [0] * len(submissions)
+    rows_by_quiz: Dict[str, List[int]] = {}
+    for row, submission in enumerate(submissions):
+        rows_by_quiz.setdefault(submission["quiz_id"], []).append(row)
+
+    for quiz_id, rows in rows_by_quiz.items():
+        key = answer_key(quizzes[quiz_id])
+        quiz_scores = score_answer_sheets(key, [submissions[row]["answers"] for row in rows])
+        for row, score in zip(rows, quiz_scores.tolist()):
+            scores[row] = score
+    return scores
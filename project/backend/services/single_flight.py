@@ -0,0 +1,68 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one execution whose outcome every caller receives"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run fn unless an identical call is in flight; followers wait up to timeout for its result"""
+        future, leader = self._claim(key)
+        if leader:
+            self._run(key, future, fn)
+            return future.result()
+        return copy.deepcopy(future.result(timeout=timeout))
+
+    async def ado(self, key: Hashable, fn: Callable[[], Any], executor: Executor,
+                  timeout: Optional[float] = None) -> Any:
+        """Async variant of do(); the leader's fn runs on executor so no caller blocks the event loop"""
+        future, leader = self._claim(key)
+        if leader:
+            executor.submit(self._run, key, future, fn)
+
+        # Shield so one caller timing out never cancels the shared call for everyone else
+        result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+        return result if leader else copy.deepcopy(result)
+
+    def stats(self) -> Dict:
+        """Coalescing counters"""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "followers": self.followers
+            }
+
+    def _claim(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]):
+        try:
+            result = fn()
+        except BaseException as e:
+            self._release(key)
+            future.set_exception(e)
+        else:
+            self._release(key)
+            future.set_result(result)
+
+    def _release(self, key: Hashable):
+        # Callers arriving after this point start a new call instead of reusing a finished one
+        with self._lock:
+            self._calls.pop(key, None)
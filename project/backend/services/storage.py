@@ -0,0 +1,689 @@
+import os
+import json
+import queue
+import time
+import heapq
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from itertools import islice
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .metrics import REGISTRY
+from .quiz_records import CompactQuiz
+
+logger = logging.getLogger(__name__)
+
+QUIZ_REMOVALS = REGISTRY.counter(
+    "quiz_removals", "Unsubmitted quizzes dropped from storage", ["reason"])
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "edututor.db")
+
+class AttemptScore(NamedTuple):
+    """The columns analytics need from an attempt, without decoding the full record"""
+    user_id: str
+    quiz_id: str
+    topic: Optional[str]
+    score: int
+    completed_at: str
+
+def _score_of(attempt: Dict) -> AttemptScore:
+    return AttemptScore(attempt["user_id"], attempt["quiz_id"], attempt.get("topic"), attempt["score"], attempt["completed_at"])
+
+class Storage:
+    """Repository for quizzes and quiz attempts; records are plain JSON-compatible dicts
+
+    A quiz is live until its first attempt is saved: if nobody submits it within its
+    time limit plus quiz_grace_seconds it expires and is purged. Saving an attempt
+    keeps its quiz for good.
+    """
+
+    quiz_grace_seconds = 3600.0
+
+    def quiz_expires_at(self, quiz: Dict, now: float) -> float:
+        """Epoch seconds after which an unsubmitted quiz may be dropped"""
+        return now + (quiz.get("time_limit") or 0) * 60 + self.quiz_grace_seconds
+
+    def save_quiz(self, quiz: Dict):
+        """Insert or replace a quiz as live"""
+        raise NotImplementedError
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        """The quiz, unless it does not exist or expired unsubmitted"""
+        raise NotImplementedError
+
+    def purge_expired_quizzes(self) -> int:
+        """Drop every expired unsubmitted quiz, returning how many went"""
+        raise NotImplementedError
+
+    def count_live_quizzes(self) -> int:
+        """Quizzes generated but not yet submitted"""
+        raise NotImplementedError
+
+    def get_quizzes(self, quiz_ids: List[str]) -> Dict[str, Dict]:
+        """The stored quizzes among quiz_ids, keyed by id; unknown ids are left out"""
+        raise NotImplementedError
+
+    def save_attempt(self, attempt: Dict):
+        """Insert one attempt, which also keeps its quiz; it should carry the quiz's topic so topic queries need no join"""
+        self.save_attempts([attempt])
+
+    def save_attempts(self, attempts: List[Dict]):
+        """Insert several attempts in one write"""
+        raise NotImplementedError
+
+    def get_attempts_for_user(self, user_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """A user's attempts oldest first; with limit, only the most recent ones"""
+        raise NotImplementedError
+
+    def get_attempts_for_quiz(self, quiz_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_attempts_for_topic(self, topic: str, limit: Optional[int] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_recent_attempts(self, limit: int = 10) -> List[Dict]:
+        """The latest attempts across all users, oldest first"""
+        raise NotImplementedError
+
+    def get_attempt_scores_for_user(self, user_id: str) -> List[AttemptScore]:
+        """A user's score columns oldest first, read through the user index"""
+        raise NotImplementedError
+
+    def get_attempt_scores_for_topic(self, topic: str) -> List[AttemptScore]:
+        """A topic's score columns oldest first, read through the topic index"""
+        raise NotImplementedError
+
+    def get_topics(self) -> List[str]:
+        """Every topic that has at least one attempt"""
+        raise NotImplementedError
+
+    def iter_attempt_scores(self) -> Iterator[AttemptScore]:
+        """Every attempt's score columns in completion order"""
+        raise NotImplementedError
+
+    def get_student_stats(self, user_id: Optional[str] = None) -> Dict[str, Dict]:
+        """Materialized per-user totals: {user_id: {attempts, score_sum, last_activity, topics: {topic: {attempts, score_sum}}}}"""
+        raise NotImplementedError
+
+    def get_topic_stats(self) -> Dict[str, Dict]:
+        """Materialized per-topic totals: {topic: {attempts, score_sum}}"""
+        raise NotImplementedError
+
+    def rebuild_aggregates(self):
+        """Recompute the materialized totals from the attempts themselves"""
+        raise NotImplementedError
+
+    def count_quizzes(self) -> int:
+        raise NotImplementedError
+
+    def count_attempts(self) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class MemoryStorage(Storage):
+    """Process-local dicts; nothing survives a restart or is shared between workers"""
+
+    def __init__(self, quiz_grace_seconds: float = 3600.0, max_live_quizzes: int = 50000):
+        self.quiz_grace_seconds = quiz_grace_seconds
+        self.max_live_quizzes = max_live_quizzes
+        # Quizzes are compact records over the shared question store, expanded to dicts on read
+        self.quizzes: Dict[str, CompactQuiz] = {}
+        # Unsubmitted quiz id -> expiry, plus a min-heap of (expiry, id) so expiring never scans;
+        # heap entries for quizzes since submitted or replaced are skipped when popped
+        self._live: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.attempts: Dict[str, Dict] = {}
+        # Secondary indexes: key -> attempt ids in insertion (completion) order
+        self._by_user: Dict[str, List[str]] = {}
+        self._by_quiz: Dict[str, List[str]] = {}
+        self._by_topic: Dict[str, List[str]] = {}
+        # Running totals, updated with every insert
+        self._student_stats: Dict[str, Dict] = {}
+        self._topic_stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def save_quiz(self, quiz: Dict):
+        record = CompactQuiz.from_dict(quiz)
+        now = time.time()
+        expires_at = self.quiz_expires_at(quiz, now)
+        with self._lock:
+            replaced = self.quizzes.get(quiz["id"])
+            self.quizzes[quiz["id"]] = record
+            # Released under the lock so no reader expands a record whose questions are gone
+            if replaced is not None:
+                replaced.release()
+            self._live[quiz["id"]] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, quiz["id"]))
+
+            # Expiring on insert keeps the live set bounded by the generation rate times the TTL...
+            self._expire(now)
+            # ...and the cap bounds it outright, giving up the quizzes closest to expiring first
+            while len(self._live) > self.max_live_quizzes:
+                self._pop_live("evicted")
+
+    def _pop_live(self, reason: str):
+        expires_at, quiz_id = heapq.heappop(self._expiry_heap)
+        if self._live.get(quiz_id) == expires_at:
+            del self._live[quiz_id]
+            self.quizzes.pop(quiz_id).release()
+            QUIZ_REMOVALS.labels(reason).inc()
+            return 1
+        return 0
+
+    def _expire(self, now: float) -> int:
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            removed += self._pop_live("expired")
+        return removed
+
+    def purge_expired_quizzes(self) -> int:
+        with self._lock:
+            return self._expire(time.time())
+
+    def count_live_quizzes(self) -> int:
+        return len(self._live)
+
+    def _readable(self, quiz_id: str, now: float) -> Optional[CompactQuiz]:
+        expires_at = self._live.get(quiz_id)
+        if expires_at is not None and expires_at <= now:
+            return None
+        return self.quizzes.get(quiz_id)
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._readable(quiz_id, time.time())
+            return record.to_dict() if record else None
+
+    def get_quizzes(self, quiz_ids: List[str]) -> Dict[str, Dict]:
+        now = time.time()
+        with self._lock:
+            records = {quiz_id: self._readable(quiz_id, now) for quiz_id in set(quiz_ids)}
+            return {quiz_id: record.to_dict() for quiz_id, record in records.items() if record}
+
+    def save_attempts(self, attempts: List[Dict]):
+        with self._lock:
+            for attempt in attempts:
+                # Like the SQLite primary key: replacing an attempt would leave stale index entries
+                if attempt["id"] in self.attempts:
+                    raise ValueError(f"Attempt {attempt['id']} already stored")
+            for attempt in attempts:
+                attempt_id = attempt["id"]
+                self.attempts[attempt_id] = attempt
+                self._by_user.setdefault(attempt["user_id"], []).append(attempt_id)
+                self._by_quiz.setdefault(attempt["quiz_id"], []).append(attempt_id)
+                if attempt.get("topic"):
+                    self._by_topic.setdefault(attempt["topic"], []).append(attempt_id)
+                self._add_to_aggregates(attempt)
+                # A submitted quiz is kept: its stale heap entry is skipped when it comes up
+                self._live.pop(attempt["quiz_id"], None)
+
+    def _add_to_aggregates(self, attempt: Dict):
+        stats = self._student_stats.setdefault(
+            attempt["user_id"], {"attempts": 0, "score_sum": 0, "last_activity": None, "topics": {}}
+        )
+        stats["attempts"] += 1
+        stats["score_sum"] += attempt["score"]
+        if stats["last_activity"] is None or attempt["completed_at"] > stats["last_activity"]:
+            stats["last_activity"] = attempt["completed_at"]
+
+        topic = attempt.get("topic")
+        if topic:
+            for totals in (stats["topics"].setdefault(topic, {"attempts": 0, "score_sum": 0}),
+                           self._topic_stats.setdefault(topic, {"attempts": 0, "score_sum": 0})):
+                totals["attempts"] += 1
+                totals["score_sum"] += attempt["score"]
+
+    def get_student_stats(self, user_id: Optional[str] = None) -> Dict[str, Dict]:
+        with self._lock:
+            if user_id is not None:
+                selected = {user_id: self._student_stats[user_id]} if user_id in self._student_stats else {}
+            else:
+                selected = self._student_stats
+            # Copies, so callers never see a total change while they read it
+            return {
+                uid: {**stats, "topics": {topic: dict(totals) for topic, totals in stats["topics"].items()}}
+                for uid, stats in selected.items()
+            }
+
+    def get_topic_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {topic: dict(totals) for topic, totals in self._topic_stats.items()}
+
+    def rebuild_aggregates(self):
+        with self._lock:
+            self._student_stats = {}
+            self._topic_stats = {}
+            for attempt in self.attempts.values():
+                self._add_to_aggregates(attempt)
+
+    def _lookup(self, index: Dict[str, List[str]], key: str, limit: Optional[int] = None) -> List[Dict]:
+        ids = index.get(key, [])
+        if limit:
+            ids = ids[-limit:]
+        return [self.attempts[attempt_id] for attempt_id in list(ids)]
+
+    def get_attempts_for_user(self, user_id: str, limit: Optional[int] = None) -> List[Dict]:
+        return self._lookup(self._by_user, user_id, limit)
+
+    def get_attempts_for_quiz(self, quiz_id: str) -> List[Dict]:
+        return self._lookup(self._by_quiz, quiz_id)
+
+    def get_attempts_for_topic(self, topic: str, limit: Optional[int] = None) -> List[Dict]:
+        return self._lookup(self._by_topic, topic, limit)
+
+    def get_recent_attempts(self, limit: int = 10) -> List[Dict]:
+        with self._lock:
+            # Dicts keep insertion order, so the newest attempts are at the end
+            return list(islice(reversed(self.attempts.values()), limit))[::-1]
+
+    def get_attempt_scores_for_user(self, user_id: str) -> List[AttemptScore]:
+        return [_score_of(a) for a in self.get_attempts_for_user(user_id)]
+
+    def get_attempt_scores_for_topic(self, topic: str) -> List[AttemptScore]:
+        return [_score_of(a) for a in self.get_attempts_for_topic(topic)]
+
+    def get_topics(self) -> List[str]:
+        return list(self._by_topic)
+
+    def iter_attempt_scores(self) -> Iterator[AttemptScore]:
+        for a in list(self.attempts.values()):
+            yield _score_of(a)
+
+    def count_quizzes(self) -> int:
+        return len(self.quizzes)
+
+    def count_attempts(self) -> int:
+        return len(self.attempts)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quizzes (
+    id TEXT PRIMARY KEY,
+    topic TEXT,
+    difficulty TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL,
+    expires_at REAL  -- epoch seconds; NULL once the quiz has an attempt
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id TEXT PRIMARY KEY,
+    quiz_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    topic TEXT,
+    score INTEGER NOT NULL,
+    completed_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_attempts_user;
+DROP INDEX IF EXISTS idx_attempts_topic;
+CREATE INDEX IF NOT EXISTS idx_attempts_user_scores ON attempts (user_id, completed_at, quiz_id, topic, score);
+CREATE INDEX IF NOT EXISTS idx_attempts_quiz ON attempts (quiz_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_topic_scores ON attempts (topic, completed_at, user_id, quiz_id, score);
+CREATE INDEX IF NOT EXISTS idx_attempts_completed ON attempts (completed_at);
+
+CREATE TABLE IF NOT EXISTS student_stats (
+    user_id TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    last_activity TEXT
+);
+CREATE TABLE IF NOT EXISTS student_topic_stats (
+    user_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    PRIMARY KEY (user_id, topic)
+);
+CREATE TABLE IF NOT EXISTS topic_stats (
+    topic TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL
+);
+
+-- The first attempt keeps its quiz, in the same transaction as the insert
+CREATE TRIGGER IF NOT EXISTS attempts_keep_quiz AFTER INSERT ON attempts
+BEGIN
+    UPDATE quizzes SET expires_at = NULL WHERE id = NEW.quiz_id AND expires_at IS NOT NULL;
+END;
+
+-- The totals are bumped in the same transaction as the insert, by whichever worker wrote it
+CREATE TRIGGER IF NOT EXISTS attempts_aggregate AFTER INSERT ON attempts
+BEGIN
+    INSERT INTO student_stats (user_id, attempts, score_sum, last_activity)
+    VALUES (NEW.user_id, 1, NEW.score, NEW.completed_at)
+    ON CONFLICT (user_id) DO UPDATE SET
+        attempts = attempts + 1,
+        score_sum = score_sum + excluded.score_sum,
+        last_activity = max(last_activity, excluded.last_activity);
+    INSERT INTO student_topic_stats (user_id, topic, attempts, score_sum)
+    SELECT NEW.user_id, NEW.topic, 1, NEW.score WHERE NEW.topic IS NOT NULL
+    ON CONFLICT (user_id, topic) DO UPDATE SET
+        attempts = attempts + 1,
+        score_sum = score_sum + excluded.score_sum;
+    INSERT INTO topic_stats (topic, attempts, score_sum)
+    SELECT NEW.topic, 1, NEW.score WHERE NEW.topic IS NOT NULL
+    ON CONFLICT (topic) DO UPDATE SET
+        attempts = attempts + 1,
+        score_sum = score_sum + excluded.score_sum;
+END;
+"""
+
+_REBUILD_AGGREGATES = """
+DELETE FROM student_stats;
+DELETE FROM student_topic_stats;
+DELETE FROM topic_stats;
+INSERT INTO student_stats (user_id, attempts, score_sum, last_activity)
+    SELECT user_id, COUNT(*), SUM(score), MAX(completed_at) FROM attempts GROUP BY user_id;
+INSERT INTO student_topic_stats (user_id, topic, attempts, score_sum)
+    SELECT user_id, topic, COUNT(*), SUM(score) FROM attempts WHERE topic IS NOT NULL GROUP BY user_id, topic;
+INSERT INTO topic_stats (topic, attempts, score_sum)
+    SELECT topic, COUNT(*), SUM(score) FROM attempts WHERE topic IS NOT NULL GROUP BY topic;
+"""
+
+# Covered by the *_scores indexes, so score queries never touch the JSON blobs
+_SCORE_COLUMNS = "user_id, quiz_id, topic, score, completed_at"
+
+# Created after the expires_at migration; partial, so it only ever holds live quizzes
+_QUIZ_EXPIRY_INDEX = "CREATE INDEX IF NOT EXISTS idx_quizzes_expires ON quizzes (expires_at) WHERE expires_at IS NOT NULL"
+
+_INSERT_QUIZ = "INSERT OR REPLACE INTO quizzes (id, topic, difficulty, created_at, data, expires_at) VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_ATTEMPT = "INSERT INTO attempts (id, quiz_id, user_id, topic, score, completed_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+_PURGE_EXPIRED_QUIZZES = "DELETE FROM quizzes WHERE expires_at IS NOT NULL AND expires_at <= ?"
+
+# (statement, rows, completion future); the future's result is the number of rows changed
+WriteJob = Tuple[str, List[tuple], Future]
+
+class SQLiteStorage(Storage):
+    """SQLite in WAL mode: readers never block the writer, and several worker processes can share one file"""
+
+    def __init__(self, path: str, max_batch: int = 512, quiz_grace_seconds: float = 3600.0,
+                 purge_interval: float = 60.0, write_timeout: float = 30.0):
+        self.path = path
+        self.max_batch = max_batch
+        self.write_timeout = write_timeout
+        self.quiz_grace_seconds = quiz_grace_seconds
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        # Each thread opens its own connection, so ":memory:" would give every thread a different database
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        if "expires_at" not in {row[1] for row in conn.execute("PRAGMA table_info(quizzes)")}:
+            # Quizzes stored before expiry existed stay, as if submitted
+            conn.execute("ALTER TABLE quizzes ADD COLUMN expires_at REAL")
+        conn.execute(_QUIZ_EXPIRY_INDEX)
+        # Databases written before the totals tables existed get them filled in once
+        if conn.execute("SELECT 1 FROM attempts LIMIT 1").fetchone() and \
+                not conn.execute("SELECT 1 FROM student_stats LIMIT 1").fetchone():
+            self.rebuild_aggregates()
+
+        # One writer thread per process turns concurrent writes into a single transaction
+        self._writes: "queue.Queue[Optional[WriteJob]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="storage-writer", daemon=True)
+        self._writer.start()
+        logger.info(f"SQLite storage ready at {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _write(self, statement: str, rows: List[tuple]) -> int:
+        if not rows:
+            return 0
+        if not self._writer.is_alive():
+            raise RuntimeError("SQLite writer thread is not running")
+        future: Future = Future()
+        self._writes.put((statement, rows, future))
+        deadline = time.monotonic() + self.write_timeout
+        # Waited for in slices, so a writer that dies with this job queued fails it instead of hanging
+        while True:
+            try:
+                return future.result(timeout=min(1.0, max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                if not self._writer.is_alive():
+                    raise RuntimeError("SQLite writer thread stopped before the write completed")
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"SQLite write not committed within {self.write_timeout}s")
+
+    def _write_loop(self):
+        conn = self._connection()
+        while True:
+            job = self._writes.get()
+            if job is None:
+                return
+            jobs = [job]
+            # Everything queued while the last commit ran goes into this one
+            while len(jobs) < self.max_batch:
+                try:
+                    job = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._commit_safely(conn, jobs)
+                    return
+                jobs.append(job)
+            self._commit_safely(conn, jobs)
+
+    def _commit_safely(self, conn: sqlite3.Connection, jobs: List[WriteJob]):
+        """Commit, failing the batch's callers rather than the writer thread if anything unexpected escapes"""
+        try:
+            self._commit(conn, jobs)
+        except Exception as e:
+            logger.error(f"SQLite writer failed a batch of {len(jobs)} writes: {e}")
+            for _, _, future in jobs:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _commit(self, conn: sqlite3.Connection, jobs: List[WriteJob]):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            changed = [conn.executemany(statement, rows).rowcount for statement, rows, _ in jobs]
+            conn.execute("COMMIT")
+        except Exception as e:
+            # Not only sqlite3.Error: binding can raise too (OverflowError for an int past 64 bits),
+            # and leaving the transaction open would hold the write lock for good
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if len(jobs) == 1:
+                jobs[0][2].set_exception(e)
+            else:
+                # Retry one by one so a single bad write only fails its own caller
+                for job in jobs:
+                    self._commit(conn, [job])
+            return
+        for (_, _, future), rowcount in zip(jobs, changed):
+            future.set_result(rowcount)
+
+    def save_quiz(self, quiz: Dict):
+        now = time.time()
+        self._write(_INSERT_QUIZ, [(
+            quiz["id"], quiz.get("topic"), quiz.get("difficulty"), quiz.get("created_at"), json.dumps(quiz),
+            self.quiz_expires_at(quiz, now)
+        )])
+        # Purge piggybacks on quiz writes, at most once per interval per worker
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.purge_expired_quizzes()
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT data FROM quizzes WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)", (quiz_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge_expired_quizzes(self) -> int:
+        removed = self._write(_PURGE_EXPIRED_QUIZZES, [(time.time(),)])
+        if removed:
+            QUIZ_REMOVALS.labels("expired").inc(removed)
+            logger.info(f"Purged {removed} expired unsubmitted quizzes")
+        return removed
+
+    def count_live_quizzes(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM quizzes WHERE expires_at IS NOT NULL").fetchone()[0]
+
+    def get_quizzes(self, quiz_ids: List[str]) -> Dict[str, Dict]:
+        conn = self._connection()
+        now = time.time()
+        unique_ids = list(set(quiz_ids))
+        quizzes = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(unique_ids), 499):
+            chunk = unique_ids[start:start + 499]
+            placeholders = ",".join("?" * len(chunk))
+            for quiz_id, data in conn.execute(
+                f"SELECT id, data FROM quizzes WHERE id IN ({placeholders}) AND (expires_at IS NULL OR expires_at > ?)",
+                chunk + [now]
+            ):
+                quizzes[quiz_id] = json.loads(data)
+        return quizzes
+
+    def save_attempts(self, attempts: List[Dict]):
+        self._write(_INSERT_ATTEMPT, [
+            (a["id"], a["quiz_id"], a["user_id"], a.get("topic"), a["score"], a["completed_at"], json.dumps(a))
+            for a in attempts
+        ])
+
+    def _attempts(self, where: str, params: tuple, limit: Optional[int]) -> List[Dict]:
+        if limit:
+            sql = f"SELECT data FROM (SELECT data, completed_at, rowid FROM attempts {where} ORDER BY completed_at DESC, rowid DESC LIMIT ?) ORDER BY completed_at, rowid"
+            params = params + (limit,)
+        else:
+            sql = f"SELECT data FROM attempts {where} ORDER BY completed_at, rowid"
+        return [json.loads(row[0]) for row in self._connection().execute(sql, params)]
+
+    def get_attempts_for_user(self, user_id: str, limit: Optional[int] = None) -> List[Dict]:
+        return self._attempts("WHERE user_id = ?", (user_id,), limit)
+
+    def get_attempts_for_quiz(self, quiz_id: str) -> List[Dict]:
+        return self._attempts("WHERE quiz_id = ?", (quiz_id,), None)
+
+    def get_attempts_for_topic(self, topic: str, limit: Optional[int] = None) -> List[Dict]:
+        return self._attempts("WHERE topic = ?", (topic,), limit)
+
+    def get_recent_attempts(self, limit: int = 10) -> List[Dict]:
+        return self._attempts("", (), limit)
+
+    def get_attempt_scores_for_user(self, user_id: str) -> List[AttemptScore]:
+        return self._scores("WHERE user_id = ?", (user_id,))
+
+    def get_attempt_scores_for_topic(self, topic: str) -> List[AttemptScore]:
+        return self._scores("WHERE topic = ?", (topic,))
+
+    def get_topics(self) -> List[str]:
+        # Answered from idx_attempts_topic_scores alone, without reading the attempt rows
+        rows = self._connection().execute("SELECT DISTINCT topic FROM attempts WHERE topic IS NOT NULL")
+        return [row[0] for row in rows]
+
+    def _scores(self, where: str, params: tuple) -> List[AttemptScore]:
+        cursor = self._connection().execute(
+            f"SELECT {_SCORE_COLUMNS} FROM attempts {where} ORDER BY completed_at, rowid", params
+        )
+        return [AttemptScore(*row) for row in cursor]
+
+    def iter_attempt_scores(self) -> Iterator[AttemptScore]:
+        cursor = self._connection().execute(
+            f"SELECT {_SCORE_COLUMNS} FROM attempts ORDER BY completed_at, rowid"
+        )
+        for row in cursor:
+            yield AttemptScore(*row)
+
+    def get_student_stats(self, user_id: Optional[str] = None) -> Dict[str, Dict]:
+        conn = self._connection()
+        where, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+        stats = {
+            uid: {"attempts": attempts, "score_sum": score_sum, "last_activity": last_activity, "topics": {}}
+            for uid, attempts, score_sum, last_activity in conn.execute(
+                f"SELECT user_id, attempts, score_sum, last_activity FROM student_stats {where}", params
+            )
+        }
+        for uid, topic, attempts, score_sum in conn.execute(
+            f"SELECT user_id, topic, attempts, score_sum FROM student_topic_stats {where}", params
+        ):
+            if uid in stats:
+                stats[uid]["topics"][topic] = {"attempts": attempts, "score_sum": score_sum}
+        return stats
+
+    def get_topic_stats(self) -> Dict[str, Dict]:
+        return {
+            topic: {"attempts": attempts, "score_sum": score_sum}
+            for topic, attempts, score_sum in self._connection().execute("SELECT topic, attempts, score_sum FROM topic_stats")
+        }
+
+    def rebuild_aggregates(self):
+        conn = self._connection()
+        # IMMEDIATE takes the write lock first, so no insert can land between the DELETE and the re-count
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _REBUILD_AGGREGATES.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info("Rebuilt attempt aggregates from the attempts table")
+
+    def count_quizzes(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM quizzes").fetchone()[0]
+
+    def count_attempts(self) -> int:
+        # Every attempt has a user, so the per-user totals add up to the table size without a COUNT(*) scan
+        return self._connection().execute("SELECT COALESCE(SUM(attempts), 0) FROM student_stats").fetchone()[0]
+
+    def close(self):
+        self._writes.put(None)
+        self._writer.join(timeout=5)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+
+def create_storage(backend: Optional[str] = None, path: Optional[str] = None) -> Storage:
+    """Build the backend named by STORAGE_BACKEND (sqlite or memory)"""
+    backend = (backend or os.getenv("STORAGE_BACKEND", "sqlite")).lower()
+    grace = float(os.getenv("QUIZ_EXPIRY_GRACE", "3600"))
+    if backend == "memory":
+        return MemoryStorage(quiz_grace_seconds=grace, max_live_quizzes=int(os.getenv("QUIZ_MAX_LIVE", "50000")))
+    if backend == "sqlite":
+        return SQLiteStorage(path or os.getenv("STORAGE_PATH", DEFAULT_SQLITE_PATH), quiz_grace_seconds=grace,
+                             purge_interval=float(os.getenv("QUIZ_PURGE_INTERVAL", "60")),
+                             write_timeout=float(os.getenv("STORAGE_WRITE_TIMEOUT", "30")))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+_storage: Optional[Storage] = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> Storage:
+    """Return the shared storage, opening it on first use"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
+
+def close_storage():
+    """Flush and close the shared storage if it was opened"""
+    global _storage
+    with _storage_lock:
+        if _storage is not None:
+            _storage.close()
+            _storage = None
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+import logging
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+API_VERSION = "2023-05-29"
+
+class WatsonxRestClient:
+    """Minimal watsonx.ai text generation client over plain HTTP, with the invoke/stream shape of WatsonxLLM"""
+
+    def __init__(self, model_id: str, url: str, apikey: str, project_id: str,
+                 params: Optional[Dict] = None, iam_url: Optional[str] = None,
+                 timeout: float = 60.0, pool_size: int = 32):
+        # requests is only needed on this transport, so it is imported here like the SDK is
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.model_id = model_id
+        self.url = url.rstrip("/")
+        self.apikey = apikey
+        self.project_id = project_id
+        self.params = params or {}
+        self.iam_url = iam_url or "https://iam.cloud.ibm.com"
+        self.timeout = timeout
+
+        # Keep-alive connections sized to the service's concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+
+    def invoke(self, prompt: str, params: Optional[Dict] = None) -> str:
+        """Generate text for prompt and return it once complete"""
+        response = self.session.post(
+            f"{self.url}/ml/v1/text/generation",
+            params={"version": API_VERSION},
+            json=self._payload(prompt, params),
+            headers=self._headers(),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return "".join(result.get("generated_text", "") for result in response.json().get("results", []))
+
+    def stream(self, prompt: str, params: Optional[Dict] = None) -> Iterator[str]:
+        """Yield generated text chunks from the server-sent event stream"""
+        with self.session.post(
+            f"{self.url}/ml/v1/text/generation_stream",
+            params={"version": API_VERSION},
+            json=self._payload(prompt, params),
+            headers={**self._headers(), "Accept": "text/event-stream"},
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                event = json.loads(line[len("data:"):].strip())
+                for result in event.get("results", []):
+                    text = result.get("generated_text")
+                    if text:
+                        yield text
+
+    def _payload(self, prompt: str, params: Optional[Dict]) -> Dict:
+        return {
+            "model_id": self.model_id,
+            "project_id": self.project_id,
+            "input": prompt,
+            "parameters": {**self.params, **(params or {})}
+        }
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self._bearer_token()}", "Content-Type": "application/json"}
+
+    def _bearer_token(self) -> str:
+        """Exchange the API key for an IAM access token, reusing it until shortly before it expires"""
+        with self._token_lock:
+            if self._token is None or time.time() >= self._token_expires - 60:
+                response = self.session.post(
+                    f"{self.iam_url.rstrip('/')}/identity/token",
+                    data={"grant_type": "urn:ibm:params:oauth:grant-type:apikey", "apikey": self.apikey},
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                token = response.json()
+                self._token = token["access_token"]
+                self._token_expires = token.get("expiration", time.time() + token.get("expires_in", 3600))
+                logger.info("Obtained IAM token for watsonx REST transport")
+            return self._token
@@ -1,417 +1,866 @@
 import os
-from typing import List, Dict
-from langchain_ibm import WatsonxLLM
-from langchain.prompts import PromptTemplate
-import json
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Optional, Tuple
 import logging
 
+from .mock_question_bank import sample_mock_questions
+from .json_stream import JSONObjectStream, extract_json_objects, extract_json_value
+from .question_cache import QuestionCache
+from .single_flight import SingleFlight
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .metrics import REGISTRY, SIZE_BUCKETS
+from .watsonx_rest import WatsonxRestClient
+
 logger = logging.getLogger(__name__)
 
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "watsonx_llm_call_seconds", "Latency of Watsonx LLM calls", ["mode", "outcome"])
+LLM_PROMPT_CHARS = REGISTRY.histogram(
+    "watsonx_prompt_chars", "Size of prompts sent to Watsonx, in characters", buckets=SIZE_BUCKETS)
+LLM_RESPONSE_CHARS = REGISTRY.histogram(
+    "watsonx_response_chars", "Size of Watsonx responses, in characters", buckets=SIZE_BUCKETS)
+PARSE_FAILURES = REGISTRY.counter(
+    "watsonx_json_parse_failures", "Watsonx responses with no usable JSON", ["path"])
+PARSED_OBJECTS = REGISTRY.counter(
+    "watsonx_json_objects", "Question objects found in Watsonx output", ["result"])
+VALIDATION_REJECTS = REGISTRY.counter(
+    "watsonx_validation_rejects", "Parsed questions rejected for a malformed shape")
+FALLBACKS = REGISTRY.counter(
+    "watsonx_fallbacks", "Requests answered with pool or mock questions instead of the model", ["reason"])
+
+# Bump whenever the generation prompt changes so stale cached questions are not reused
+PROMPT_VERSION = "v2"
+
+# Output size model: a generated question costs about TOKENS_PER_QUESTION tokens
+MAX_NEW_TOKENS = 2000
+TOKENS_PER_QUESTION = 120
+TOKENS_PER_BATCH_SECTION = 20
+OUTPUT_TOKENS_OVERHEAD = 40
+OUTPUT_TOKENS_HEADROOM = 1.25
+
+# Prompts are compiled once at import; rendering is a plain str.format
+QUIZ_PROMPT_TEMPLATE = """
+You are an expert educational content creator. Generate {num_questions} high-quality multiple choice questions about {topic} at {difficulty} difficulty level.
+
+Requirements:
+1. Each question must be clear, educational, and appropriate for the difficulty level
+2. Provide exactly 4 answer options (A, B, C, D)
+3. Include a brief explanation for the correct answer
+4. Questions should test understanding, not just memorization
+5. Ensure questions are factually accurate and well-researched
+
+Topic: {topic}
+Difficulty: {difficulty}
+Number of questions: {num_questions}
+{notes}
+Format your response as a valid JSON array with this exact structure:
+[
+  {{
+    "question": "What is the capital of France?",
+    "options": ["London", "Berlin", "Paris", "Madrid"],
+    "correct_answer": 2,
+    "explanation": "Paris is the capital and largest city of France, located in the north-central part of the country."
+  }}
+]
+
+Generate {num_questions} questions now:
+"""
+
+COMPACT_QUIZ_PROMPT_TEMPLATE = """
+Write {num_questions} accurate multiple choice questions about {topic} at {difficulty} difficulty. Each has exactly 4 options, the 0-based index of the correct option, and a one-sentence explanation.
+{notes}
+Reply with only a JSON array like:
+[{{"question": "...", "options": ["...", "...", "...", "..."], "correct_answer": 0, "explanation": "..."}}]
+"""
+
+# (topic, difficulty, num_questions)
+QuizSpec = Tuple[str, str, int]
+
+BATCH_PROMPT_TEMPLATE = """
+You are an expert educational content creator. Generate high-quality multiple choice questions for each section listed below.
+
+Requirements:
+1. Each question must be clear, educational, and appropriate for the section's difficulty level
+2. Provide exactly 4 answer options (A, B, C, D)
+3. Include a brief explanation for the correct answer
+4. Questions should test understanding, not just memorization
+5. Ensure questions are factually accurate and well-researched
+
+Sections:
+{sections}
+
+Format your response as a single valid JSON object that maps every section id to a JSON array of its questions, with this exact structure:
+{{
+  "s1": [
+    {{
+      "question": "What is the capital of France?",
+      "options": ["London", "Berlin", "Paris", "Madrid"],
+      "correct_answer": 2,
+      "explanation": "Paris is the capital and largest city of France, located in the north-central part of the country."
+    }}
+  ]
+}}
+
+Generate the questions for all sections now:
+"""
+
+class WatsonxSDKClient:
+    """invoke/stream over WatsonxLLM's underlying ModelInference, so per-call params reach the model
+
+    The pinned langchain-ibm sends only the constructor's params, and passing params= to its
+    invoke or stream collides with that argument; the SDK's generate_text calls take them directly.
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.model = llm.watsonx_model
+
+    def invoke(self, prompt: str, params: Optional[Dict] = None) -> str:
+        return self.model.generate_text(prompt=prompt, params=params or self.llm.params)
+
+    def stream(self, prompt: str, params: Optional[Dict] = None) -> Iterator[str]:
+        return self.model.generate_text_stream(prompt=prompt, params=params or self.llm.params)
+
+class QuestionGenerationError(Exception):
+    """Raised when the model response yields no usable questions"""
+
 class WatsonxService:
     def __init__(self):
         self.model_id = os.getenv("WATSONX_MODEL_ID", "ibm-granite/granite-3.3-2b-instruct")
         self.api_key = os.getenv("WATSONX_APIKEY")
         self.project_id = os.getenv("WATSONX_PROJECT_ID")
         self.endpoint = os.getenv("WATSONX_URL", "https://us-south.ml.cloud.ibm.com")
+        self.max_concurrency = int(os.getenv("WATSONX_MAX_CONCURRENCY", "32"))
+        self.transport = os.getenv("WATSONX_TRANSPORT", "sdk").lower()
+        self.topup_max_rounds = int(os.getenv("WATSONX_TOPUP_ROUNDS", "2"))
+        self.topup_deadline = float(os.getenv("WATSONX_TOPUP_DEADLINE", "20"))
+        # Never let a chunk outgrow what fits in one call's output budget
+        max_per_call = int((MAX_NEW_TOKENS / OUTPUT_TOKENS_HEADROOM - OUTPUT_TOKENS_OVERHEAD) // TOKENS_PER_QUESTION)
+        self.chunk_size = max(1, min(int(os.getenv("WATSONX_CHUNK_QUESTIONS", "8")), max_per_call))
+        self.compact_prompts = os.getenv("WATSONX_PROMPT_STYLE", "full").lower() == "compact"
+        self.call_timeout = float(os.getenv("WATSONX_CALL_TIMEOUT", "30"))
+        self.hedge_requests = os.getenv("WATSONX_HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+        self.hedge_min_samples = int(os.getenv("WATSONX_HEDGE_MIN_SAMPLES", "20"))
+        self._llm_params = {
+            "decoding_method": "greedy",
+            "max_new_tokens": MAX_NEW_TOKENS,
+            "temperature": 0.7,
+            "repetition_penalty": 1.1
+        }
+        
+        # Bounded worker pool so blocking LLM calls never run on the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="watsonx"
+        )
+        # Chunks of one large quiz run here, so a generation never waits on its own pool
+        self._chunk_executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="watsonx-chunk"
+        )
+        
+        # Identical topic/difficulty requests within the TTL share one LLM round trip
+        self.question_cache = QuestionCache(
+            max_entries=int(os.getenv("WATSONX_CACHE_SIZE", "512")),
+            ttl_seconds=float(os.getenv("WATSONX_CACHE_TTL", "900"))
+        )
+        
+        self._inflight = SingleFlight()
+        
+        # Raw LLM calls (and stream reads) run here so a stuck call can be timed out or raced by a
+        # hedge. Hedges and calls abandoned at their deadline keep a thread until the SDK returns,
+        # hence twice the generation concurrency; once those are used up, new calls queue and time out.
+        self._call_executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency * 2,
+            thread_name_prefix="watsonx-call"
+        )
+        self.breaker = CircuitBreaker(
+            window_size=int(os.getenv("WATSONX_BREAKER_WINDOW", "50")),
+            min_calls=int(os.getenv("WATSONX_BREAKER_MIN_CALLS", "10")),
+            failure_rate=float(os.getenv("WATSONX_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("WATSONX_BREAKER_SLOW_CALL_SECONDS", "10")),
+            slow_call_rate=float(os.getenv("WATSONX_BREAKER_SLOW_CALL_RATE", "0.8")),
+            open_seconds=float(os.getenv("WATSONX_BREAKER_OPEN_SECONDS", "30"))
+        )
+        self.hedge_stats = {"sent": 0, "won": 0}
+        # Optional warm source (the question pool) consulted before the mock bank
+        self._fallback_provider: Optional[Callable[[str, str, int], Optional[List[Dict]]]] = None
+        
+        self.parse_stats = {"recovered": 0, "dropped": 0}
+        self._stats_lock = threading.Lock()
         
         if not all([self.api_key, self.project_id]):
             logger.warning("Watsonx credentials not found, using enhanced mock responses")
             self.llm = None
         else:
             try:
-                self.llm = WatsonxLLM(
-                    model_id=self.model_id,
-                    url=self.endpoint,
-                    apikey=self.api_key,
-                    project_id=self.project_id,
-                    params={
-                        "decoding_method": "greedy",
-                        "max_new_tokens": 2000,
-                        "temperature": 0.7,
-                        "repetition_penalty": 1.1
-                    }
-                )
-                logger.info("✅ IBM Watsonx initialized successfully with Granite model!")
+                if self.transport == "rest":
+                    # Plain HTTP client, e.g. for pointing WATSONX_URL at a local stand-in server
+                    self.llm = WatsonxRestClient(
+                        model_id=self.model_id,
+                        url=self.endpoint,
+                        apikey=self.api_key,
+                        project_id=self.project_id,
+                        params=self._llm_params,
+                        iam_url=os.getenv("WATSONX_IAM_URL"),
+                        pool_size=self.max_concurrency * 2
+                    )
+                else:
+                    # Imported here: langchain_ibm dominates import time and is unused in mock mode
+                    from langchain_ibm import WatsonxLLM
+                    self.llm = WatsonxSDKClient(WatsonxLLM(
+                        model_id=self.model_id,
+                        url=self.endpoint,
+                        apikey=self.api_key,
+                        project_id=self.project_id,
+                        params=self._llm_params
+                    ))
+                logger.info(f"✅ IBM Watsonx initialized successfully with Granite model! ({self.transport} transport at {self.endpoint})")
             except Exception as e:
                 logger.error(f"Failed to initialize Watsonx: {e}")
                 self.llm = None
 
-    def generate_quiz_questions(self, topic: str, difficulty: str, num_questions: int = 5) -> List[Dict]:
+    def generate_quiz_questions(self, topic: str, difficulty: str, num_questions: int = 5,
+                                use_cache: bool = True, timeout: Optional[float] = None) -> List[Dict]:
         """Generate quiz questions using IBM Granite model"""
         
         if not self.llm:
             logger.info("Using enhanced mock questions for development")
             return self._get_enhanced_mock_questions(topic, difficulty, num_questions)
         
+        cache_key = QuestionCache.make_key(topic, difficulty, num_questions, self.model_id, self.prompt_version)
+        generate = functools.partial(self._generate_and_cache, cache_key, topic, difficulty, num_questions)
         try:
-            prompt_template = PromptTemplate(
-                input_variables=["topic", "difficulty", "num_questions"],
-                template="""
-                You are an expert educational content creator. Generate {num_questions} high-quality multiple choice questions about {topic} at {difficulty} difficulty level.
-
-                Requirements:
-                1. Each question must be clear, educational, and appropriate for the difficulty level
-                2. Provide exactly 4 answer options (A, B, C, D)
-                3. Include a brief explanation for the correct answer
-                4. Questions should test understanding, not just memorization
-                5. Ensure questions are factually accurate and well-researched
-
-                Topic: {topic}
-                Difficulty: {difficulty}
-                Number of questions: {num_questions}
-
-                Format your response as a valid JSON array with this exact structure:
-                [
-                  {{
-                    "question": "What is the capital of France?",
-                    "options": ["London", "Berlin", "Paris", "Madrid"],
-                    "correct_answer": 2,
-                    "explanation": "Paris is the capital and largest city of France, located in the north-central part of the country."
-                  }}
-                ]
-
-                Generate {num_questions} questions now:
-                """
-            )
+            if not use_cache:
+                # Callers asking for fresh content never share another request's result
+                return generate()
             
-            prompt = prompt_template.format(
-                topic=topic,
-                difficulty=difficulty,
-                num_questions=num_questions
-            )
-            
-            logger.info(f"Generating {num_questions} questions for {topic} ({difficulty}) using IBM Granite AI")
-            response = self.llm.invoke(prompt)
+            cached = self.question_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving {topic} ({difficulty}) questions from cache")
+                return cached
             
-            # Parse the JSON response
+            # Identical concurrent requests share one in-flight generation
+            return self._inflight.do(cache_key, generate, timeout=timeout)
+        except Exception as e:
+            return self._fallback_after_error(e, topic, difficulty, num_questions)
+
+    def _generate_and_cache(self, cache_key, topic: str, difficulty: str, num_questions: int) -> List[Dict]:
+        questions = self._generate_with_llm(topic, difficulty, num_questions)
+        # Fresh results still refresh the cache for the next caller
+        self.question_cache.put(cache_key, questions)
+        return questions
+
+    def _fallback_after_error(self, error: Exception, topic: str, difficulty: str, num_questions: int) -> List[Dict]:
+        FALLBACKS.labels(type(error).__name__).inc()
+        if isinstance(error, CircuitOpenError):
+            logger.info(f"Watsonx circuit open, serving fallback {topic} ({difficulty}) questions")
+        elif isinstance(error, QuestionGenerationError):
+            logger.warning(f"{error}, using mock questions")
+        elif isinstance(error, TimeoutError):
+            logger.warning(f"Timed out waiting for {topic} ({difficulty}) questions, using mock questions")
+        else:
+            logger.error(f"Error generating questions with Watsonx: {error}")
+        return self.get_fallback_questions(topic, difficulty, num_questions)
+
+    def _generate_with_llm(self, topic: str, difficulty: str, num_questions: int) -> List[Dict]:
+        """Call the Granite model and return validated questions, raising on unusable output"""
+        deadline = time.monotonic() + self.topup_deadline
+        sizes = self._chunk_sizes(num_questions)
+        if len(sizes) == 1:
+            first_round = self._request_questions(topic, difficulty, num_questions)
+        else:
+            first_round = self._request_chunks(topic, difficulty, sizes)
+        accepted = self._add_unique([], first_round, num_questions)
+        
+        # Ask only for the shortfall instead of regenerating the whole quiz
+        rounds = 0
+        while len(accepted) < num_questions and rounds < self.topup_max_rounds and time.monotonic() < deadline:
+            rounds += 1
+            shortfall = num_questions - len(accepted)
+            logger.info(f"Topping up {shortfall} missing {topic} questions (round {rounds})")
             try:
-                # Clean the response to extract JSON
-                response_clean = response.strip()
-                if response_clean.startswith('```json'):
-                    response_clean = response_clean[7:]
-                if response_clean.endswith('```'):
-                    response_clean = response_clean[:-3]
-                
-                questions = json.loads(response_clean)
-                
-                if isinstance(questions, list) and len(questions) > 0:
-                    # Validate question format
-                    validated_questions = []
-                    for q in questions:
-                        if self._validate_question(q):
-                            validated_questions.append(q)
-                    
-                    if validated_questions:
-                        logger.info(f"Successfully generated {len(validated_questions)} questions using IBM Granite AI")
-                        return validated_questions
-                    else:
-                        logger.warning("No valid questions in Watsonx response, using mock questions")
-                        return self._get_enhanced_mock_questions(topic, difficulty, num_questions)
+                extra = self._request_questions(
+                    topic, difficulty, shortfall,
+                    avoid=[q["question"] for q in accepted],
+                    compact=True
+                )
+            except QuestionGenerationError as e:
+                logger.warning(f"Top-up round {rounds} for {topic} produced nothing usable: {e}")
+                continue
+            except (CircuitOpenError, TimeoutError) as e:
+                # Keep what the first round produced rather than discarding it
+                logger.warning(f"Stopping {topic} top-up: {e}")
+                break
+            accepted = self._add_unique(accepted, extra, num_questions)
+        
+        if not accepted:
+            raise QuestionGenerationError("No valid questions in Watsonx response")
+        
+        logger.info(f"Successfully generated {len(accepted)} questions using IBM Granite AI")
+        return accepted
+
+    def _request_chunks(self, topic: str, difficulty: str, sizes: List[int]) -> List[Dict]:
+        """Generate a large quiz as parallel chunks and merge whatever each chunk produced"""
+        logger.info(f"Splitting {sum(sizes)} {topic} questions into {len(sizes)} parallel chunks")
+        futures = [
+            self._chunk_executor.submit(
+                self._request_questions, topic, difficulty, size,
+                None, (part, len(sizes)), self.compact_prompts
+            )
+            for part, size in enumerate(sizes, start=1)
+        ]
+        
+        merged = []
+        for future in futures:
+            try:
+                merged.extend(future.result())
+            except Exception as e:
+                # The top-up round covers whatever a failed chunk should have produced
+                logger.warning(f"Chunk generation for {topic} failed: {e}")
+        if not merged:
+            raise QuestionGenerationError("No chunk produced valid questions")
+        return merged
+
+    def _request_questions(self, topic: str, difficulty: str, num_questions: int,
+                           avoid: Optional[List[str]] = None, part: Optional[Tuple[int, int]] = None,
+                           compact: Optional[bool] = None) -> List[Dict]:
+        """One LLM round trip returning the validated questions it produced"""
+        if compact is None:
+            compact = self.compact_prompts
+        prompt = self._build_prompt(topic, difficulty, num_questions, avoid, part, compact)
+        
+        logger.info(f"Generating {num_questions} questions for {topic} ({difficulty}) using IBM Granite AI")
+        response = self._invoke(prompt, self._max_new_tokens(num_questions))
+        
+        # Salvage every complete question object, even from chatty or truncated output
+        questions, parse_stats = extract_json_objects(response)
+        self._record_parse_stats(parse_stats)
+        logger.info(f"Recovered {parse_stats['recovered']} question objects from Watsonx response ({parse_stats['dropped']} dropped)")
+        
+        if not questions:
+            PARSE_FAILURES.labels("single").inc()
+            logger.debug(f"Raw response: {response}")
+            raise QuestionGenerationError("No JSON question objects in Watsonx response")
+        
+        # Validate question format
+        validated_questions = self._valid_questions(questions)
+        if not validated_questions:
+            raise QuestionGenerationError("No valid questions in Watsonx response")
+        return validated_questions
+
+    def _add_unique(self, accepted: List[Dict], candidates: List[Dict], limit: int) -> List[Dict]:
+        """Append candidates whose stems are not already accepted, up to limit questions"""
+        seen = {q["question"].strip().lower() for q in accepted}
+        result = list(accepted)
+        for q in candidates:
+            if len(result) >= limit:
+                break
+            stem = q["question"].strip().lower()
+            if stem not in seen:
+                seen.add(stem)
+                result.append(q)
+        return result
+
+    def _build_prompt(self, topic: str, difficulty: str, num_questions: int,
+                      avoid: Optional[List[str]] = None, part: Optional[Tuple[int, int]] = None,
+                      compact: bool = False) -> str:
+        """Render the single-topic generation prompt"""
+        notes = ""
+        if part:
+            notes += f"\nThis is part {part[0]} of {part[1]} of a larger quiz; favour subtopics other parts are unlikely to cover.\n"
+        if avoid:
+            notes += "\nDo not repeat or rephrase any of these existing questions:\n" + "\n".join(f"- {stem}" for stem in avoid) + "\n"
+        
+        template = COMPACT_QUIZ_PROMPT_TEMPLATE if compact else QUIZ_PROMPT_TEMPLATE
+        return template.format(
+            topic=topic,
+            difficulty=difficulty,
+            num_questions=num_questions,
+            notes=notes
+        )
+
+    def _max_new_tokens(self, num_questions: int, sections: int = 0) -> int:
+        """Size the output budget to the request instead of always reserving MAX_NEW_TOKENS"""
+        expected = OUTPUT_TOKENS_OVERHEAD + sections * TOKENS_PER_BATCH_SECTION + num_questions * TOKENS_PER_QUESTION
+        return min(MAX_NEW_TOKENS, int(expected * OUTPUT_TOKENS_HEADROOM))
+
+    def _chunk_sizes(self, num_questions: int) -> List[int]:
+        """Split a large request into near-equal chunks that each fit one call's budget"""
+        chunks = max(1, -(-num_questions // self.chunk_size))
+        base, extra = divmod(num_questions, chunks)
+        return [base + (1 if i < extra else 0) for i in range(chunks)]
+
+    def _invoke(self, prompt: str, max_new_tokens: int) -> str:
+        """Single LLM call with a per-call output budget, guarded by the circuit breaker and a timeout"""
+        if not self.breaker.allow():
+            LLM_CALL_SECONDS.labels("invoke", "rejected").observe(0.0)
+            raise CircuitOpenError("Watsonx circuit is open")
+        
+        LLM_PROMPT_CHARS.observe(len(prompt))
+        params = {**self._llm_params, "max_new_tokens": max_new_tokens}
+        started = time.monotonic()
+        try:
+            response = self._hedged_call(prompt, params)
+        except Exception as e:
+            elapsed = time.monotonic() - started
+            LLM_CALL_SECONDS.labels("invoke", "timeout" if isinstance(e, TimeoutError) else "error").observe(elapsed)
+            self.breaker.record_failure(elapsed)
+            raise
+        elapsed = time.monotonic() - started
+        LLM_CALL_SECONDS.labels("invoke", "ok").observe(elapsed)
+        LLM_RESPONSE_CHARS.observe(len(response))
+        self.breaker.record_success(elapsed)
+        return response
+
+    def _hedged_call(self, prompt: str, params: Dict) -> str:
+        """Run the call with a deadline, racing a second copy once the first outlives the p95 latency"""
+        deadline = time.monotonic() + self.call_timeout
+        pending = {self._call_executor.submit(self.llm.invoke, prompt, params=params)}
+        hedge: Optional[Future] = None
+        
+        hedge_after = None
+        if self.hedge_requests:
+            hedge_after = self.breaker.latency_percentile(0.95, self.hedge_min_samples)
+        if hedge_after is not None and hedge_after < self.call_timeout:
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                hedge = self._call_executor.submit(self.llm.invoke, prompt, params=params)
+                pending.add(hedge)
+                with self._stats_lock:
+                    self.hedge_stats["sent"] += 1
+        
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._stats_lock:
+                            self.hedge_stats["won"] += 1
+                    # A losing call cannot be interrupted; its result is simply discarded
+                    return future.result()
+                error = future.exception()
+        
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"Watsonx call exceeded {self.call_timeout}s")
+
+    def generate_quiz_batch(self, specs: List[QuizSpec], use_cache: bool = True) -> List[List[Dict]]:
+        """Generate questions for several topics, packing them into as few LLM calls as fit the token budget"""
+        if not self.llm:
+            return [self._get_enhanced_mock_questions(*spec) for spec in specs]
+        
+        results, pending = self._lookup_batch_cache(specs, use_cache)
+        
+        failed = []
+        for group in self._pack_batch(specs, pending):
+            sections = self._generate_batch_group(specs, group)
+            for index, questions in zip(group, sections):
+                if questions is None:
+                    failed.append(index)
                 else:
-                    logger.warning("Invalid response format from Watsonx, using mock questions")
-                    return self._get_enhanced_mock_questions(topic, difficulty, num_questions)
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response from Watsonx: {e}")
-                logger.debug(f"Raw response: {response}")
-                return self._get_enhanced_mock_questions(topic, difficulty, num_questions)
-                
+                    results[index] = questions
+        
+        # Only the topics whose section could not be used pay for a separate call
+        for index in failed:
+            results[index] = self.generate_quiz_questions(*specs[index], use_cache=False)
+        
+        return results
+
+    async def agenerate_quiz_batch(self, specs: List[QuizSpec], use_cache: bool = True,
+                                   max_parallel: Optional[int] = None,
+                                   timeout: Optional[float] = None) -> List[List[Dict]]:
+        """Awaitable batched generation; packed prompts run concurrently with a per-call timeout"""
+        if not self.llm:
+            return [self._get_enhanced_mock_questions(*spec) for spec in specs]
+        
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max(1, max_parallel or self.max_concurrency))
+        results, pending = self._lookup_batch_cache(specs, use_cache)
+        
+        async def run_group(group: List[int]):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(
+                            self._executor,
+                            functools.partial(self._generate_batch_group, specs, group)
+                        ),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Batched generation for {len(group)} topics timed out after {timeout}s, using fallback questions")
+                    return [self.get_fallback_questions(*specs[index]) for index in group]
+        
+        async def run_single(index: int):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.agenerate_quiz_questions(*specs[index], use_cache=False),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Generation for {specs[index][0]} timed out after {timeout}s, using fallback questions")
+                    return self.get_fallback_questions(*specs[index])
+        
+        groups = self._pack_batch(specs, pending)
+        group_sections = await asyncio.gather(*[run_group(group) for group in groups])
+        
+        failed = []
+        for group, sections in zip(groups, group_sections):
+            for index, questions in zip(group, sections):
+                if questions is None:
+                    failed.append(index)
+                else:
+                    results[index] = questions
+        
+        retried = await asyncio.gather(*[run_single(index) for index in failed])
+        for index, questions in zip(failed, retried):
+            results[index] = questions
+        
+        return results
+
+    def stream_quiz_questions(self, topic: str, difficulty: str, num_questions: int = 5) -> Iterator[Dict]:
+        """Yield validated questions one at a time as the model produces them"""
+        if not self.llm:
+            yield from self._get_enhanced_mock_questions(topic, difficulty, num_questions)
+            return
+        
+        if not self.breaker.allow():
+            logger.info(f"Watsonx circuit open, streaming fallback {topic} ({difficulty}) questions")
+            FALLBACKS.labels("CircuitOpenError").inc()
+            yield from self.get_fallback_questions(topic, difficulty, num_questions)
+            return
+        
+        prompt = self._build_prompt(topic, difficulty, num_questions)
+        parser = JSONObjectStream()
+        accepted = []
+        failed = False
+        
+        logger.info(f"Streaming {num_questions} questions for {topic} ({difficulty}) using IBM Granite AI")
+        LLM_PROMPT_CHARS.observe(len(prompt))
+        started = time.monotonic()
+        deadline = started + self.call_timeout
+        timed_out = False
+        chunks = None
+        pending: Optional[Future] = None
+        try:
+            params = {**self._llm_params, "max_new_tokens": self._max_new_tokens(num_questions)}
+            chunks = iter(self.llm.stream(prompt, params=params))
+            end = object()
+            while True:
+                # Each chunk is pulled on the call pool so a stalled stream is abandoned at the
+                # deadline like a stalled invoke, instead of pinning this thread indefinitely
+                pending = self._call_executor.submit(next, chunks, end)
+                done, _ = wait([pending], timeout=max(0.0, deadline - time.monotonic()))
+                if not done:
+                    timed_out = True
+                    raise TimeoutError(f"Watsonx stream exceeded {self.call_timeout}s")
+                chunk = pending.result()
+                if chunk is end:
+                    break
+                for q in parser.feed(chunk):
+                    if len(accepted) >= num_questions:
+                        continue
+                    if self._validate_question(q):
+                        accepted.append(q)
+                        yield q
+                    else:
+                        VALIDATION_REJECTS.inc()
+                if len(accepted) >= num_questions:
+                    break
+        except Exception as e:
+            failed = True
+            logger.error(f"Error streaming questions from Watsonx: {e}")
+        finally:
+            # Release the upstream stream when leaving early (enough questions, an error, or the
+            # consumer going away). A read abandoned at the deadline is still running in the
+            # call pool and cannot be closed from here; it ends when the SDK call does.
+            if chunks is not None and (pending is None or pending.done()):
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+        
+        # Full stream duration is not comparable with invoke latency, so it stays out of the p95
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        outcome = "timeout" if timed_out else "error" if failed else "ok"
+        LLM_CALL_SECONDS.labels("stream", outcome).observe(time.monotonic() - started)
+        
+        stats = parser.close()
+        self._record_parse_stats(stats)
+        logger.info(f"Streamed {len(accepted)} valid questions ({stats['recovered']} parsed, {stats['dropped']} dropped)")
+        
+        if len(accepted) >= num_questions:
+            self.question_cache.put(
+                QuestionCache.make_key(topic, difficulty, num_questions, self.model_id, self.prompt_version),
+                accepted
+            )
+        else:
+            # Fill only the shortfall, so no warm pool questions are taken just to be thrown away
+            yield from self.get_fallback_questions(topic, difficulty, num_questions - len(accepted))
+
+    async def astream_quiz_questions(self, topic: str, difficulty: str, num_questions: int = 5) -> AsyncIterator[Dict]:
+        """Async iterator over stream_quiz_questions, pulling each item on the worker pool"""
+        loop = asyncio.get_running_loop()
+        iterator = self.stream_quiz_questions(topic, difficulty, num_questions)
+        done = object()
+        while True:
+            q = await loop.run_in_executor(self._executor, next, iterator, done)
+            if q is done:
+                break
+            yield q
+
+    def _lookup_batch_cache(self, specs: List[QuizSpec], use_cache: bool) -> Tuple[List[Optional[List[Dict]]], List[int]]:
+        """Fill cached batch entries and return the indexes that still need generating"""
+        results: List[Optional[List[Dict]]] = [None] * len(specs)
+        pending = []
+        for index, (topic, difficulty, num_questions) in enumerate(specs):
+            if use_cache:
+                key = QuestionCache.make_key(topic, difficulty, num_questions, self.model_id, self.prompt_version)
+                results[index] = self.question_cache.get(key)
+            if results[index] is None:
+                pending.append(index)
+        return results, pending
+
+    def _pack_batch(self, specs: List[QuizSpec], indexes: List[int]) -> List[List[int]]:
+        """Greedily group spec indexes so each group's expected output, with headroom, fits in MAX_NEW_TOKENS"""
+        groups = []
+        current: List[int] = []
+        used = 0
+        for index in indexes:
+            cost = TOKENS_PER_BATCH_SECTION + specs[index][2] * TOKENS_PER_QUESTION
+            # Same headroom _max_new_tokens adds, so a full group's budget is never capped below it
+            if current and (used + cost + OUTPUT_TOKENS_OVERHEAD) * OUTPUT_TOKENS_HEADROOM > MAX_NEW_TOKENS:
+                groups.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    def _generate_batch_group(self, specs: List[QuizSpec], group: List[int]) -> List[Optional[List[Dict]]]:
+        """Run one packed prompt and split the answer per section; None marks a section that failed"""
+        if len(group) == 1:
+            # A lone topic gains nothing from the batch format
+            return [self.generate_quiz_questions(*specs[group[0]], use_cache=False)]
+        
+        section_lines = []
+        for position, index in enumerate(group, start=1):
+            topic, difficulty, num_questions = specs[index]
+            section_lines.append(f'- "s{position}": {num_questions} questions about {topic} at {difficulty} difficulty level')
+        prompt = BATCH_PROMPT_TEMPLATE.format(sections="\n".join(section_lines))
+        
+        logger.info(f"Generating questions for {len(group)} topics in one IBM Granite AI call")
+        try:
+            response = self._invoke(
+                prompt,
+                self._max_new_tokens(sum(specs[index][2] for index in group), sections=len(group))
+            )
         except Exception as e:
-            logger.error(f"Error generating questions with Watsonx: {e}")
+            logger.error(f"Error generating batched questions with Watsonx: {e}")
+            return [self.get_fallback_questions(*specs[index]) for index in group]
+        
+        try:
+            payload = extract_json_value(response)
+        except ValueError as e:
+            PARSE_FAILURES.labels("batch").inc()
+            logger.error(f"Failed to parse batched JSON response from Watsonx, retrying topics individually: {e}")
+            return [None] * len(group)
+        
+        if not isinstance(payload, dict):
+            PARSE_FAILURES.labels("batch").inc()
+            logger.warning("Batched Watsonx response was not a JSON object, retrying topics individually")
+            return [None] * len(group)
+        
+        sections = []
+        for position, index in enumerate(group, start=1):
+            topic, difficulty, num_questions = specs[index]
+            questions = payload.get(f"s{position}")
+            validated = self._valid_questions(questions) if isinstance(questions, list) else []
+            if not validated:
+                logger.warning(f"Section for {topic} missing or invalid in batched response")
+                sections.append(None)
+                continue
+            
+            validated = validated[:num_questions]
+            self.question_cache.put(
+                QuestionCache.make_key(topic, difficulty, num_questions, self.model_id, self.prompt_version),
+                validated
+            )
+            sections.append(validated)
+        return sections
+
+    async def agenerate_quiz_questions(self, topic: str, difficulty: str, num_questions: int = 5,
+                                       use_cache: bool = True, timeout: Optional[float] = None) -> List[Dict]:
+        """Awaitable variant of generate_quiz_questions for async request handlers"""
+        if not self.llm:
+            # Mock generation is cheap, no need to hop to a worker thread
             return self._get_enhanced_mock_questions(topic, difficulty, num_questions)
+        
+        loop = asyncio.get_running_loop()
+        if not use_cache:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(self.generate_quiz_questions, topic, difficulty, num_questions, False)
+            )
+        
+        cache_key = QuestionCache.make_key(topic, difficulty, num_questions, self.model_id, self.prompt_version)
+        cached = self.question_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Serving {topic} ({difficulty}) questions from cache")
+            return cached
+        
+        # Followers await the leader's future directly instead of parking a worker thread
+        try:
+            return await self._inflight.ado(
+                cache_key,
+                functools.partial(self._generate_and_cache, cache_key, topic, difficulty, num_questions),
+                self._executor,
+                timeout=timeout
+            )
+        except Exception as e:
+            return self._fallback_after_error(e, topic, difficulty, num_questions)
+
+    def generate_fresh_questions(self, topic: str, difficulty: str, num_questions: int) -> List[Dict]:
+        """Generate uncached questions straight from the model, raising instead of falling back to mocks"""
+        if not self.llm:
+            raise QuestionGenerationError("Watsonx is not configured")
+        return self._generate_with_llm(topic, difficulty, num_questions)
+
+    @property
+    def prompt_version(self) -> str:
+        """Cache-key component identifying the prompt wording in use"""
+        return f"{PROMPT_VERSION}-{'compact' if self.compact_prompts else 'full'}"
+
+    def get_fallback_questions(self, topic: str, difficulty: str, num_questions: int = 5) -> List[Dict]:
+        """Questions to serve when the model cannot answer in time: warm pool first, then the mock bank"""
+        if self._fallback_provider is not None:
+            try:
+                pooled = self._fallback_provider(topic, difficulty, num_questions)
+            except Exception as e:
+                logger.warning(f"Fallback provider failed: {e}")
+                pooled = None
+            if pooled:
+                return pooled
+        return self._get_enhanced_mock_questions(topic, difficulty, num_questions)
+
+    def set_fallback_provider(self, provider: Optional[Callable[[str, str, int], Optional[List[Dict]]]]):
+        """Register a callable returning ready-made questions (or None) to try before the mock bank"""
+        self._fallback_provider = provider
+
+    def get_parse_stats(self) -> Dict:
+        """Totals of question objects recovered from and dropped out of model responses"""
+        with self._stats_lock:
+            return dict(self.parse_stats)
+
+    def _record_parse_stats(self, stats: Dict):
+        PARSED_OBJECTS.labels("recovered").inc(stats["recovered"])
+        PARSED_OBJECTS.labels("dropped").inc(stats["dropped"])
+        with self._stats_lock:
+            self.parse_stats["recovered"] += stats["recovered"]
+            self.parse_stats["dropped"] += stats["dropped"]
+
+    def get_cache_stats(self) -> Dict:
+        """Expose question cache hit/miss counters"""
+        return self.question_cache.stats()
+
+    def get_coalescing_stats(self) -> Dict:
+        """Expose how many generations were shared between identical concurrent requests"""
+        return self._inflight.stats()
+
+    def get_circuit_stats(self) -> Dict:
+        """Expose circuit breaker state, hedging counters and the current p95 call latency"""
+        with self._stats_lock:
+            hedges = dict(self.hedge_stats)
+        return {
+            **self.breaker.stats(),
+            "call_timeout": self.call_timeout,
+            "p95_latency": self.breaker.latency_percentile(0.95),
+            "hedging_enabled": self.hedge_requests,
+            "hedges_sent": hedges["sent"],
+            "hedges_won": hedges["won"]
+        }
+
+    def shutdown(self):
+        """Release the LLM worker pool"""
+        self._executor.shutdown(wait=False)
+        self._chunk_executor.shutdown(wait=False)
+        self._call_executor.shutdown(wait=False)
+
+    def _valid_questions(self, questions: List[Dict]) -> List[Dict]:
+        """Keep well-formed questions, counting the ones rejected"""
+        valid = [q for q in questions if self._validate_question(q)]
+        if len(valid) < len(questions):
+            VALIDATION_REJECTS.inc(len(questions) - len(valid))
+        return valid
 
     def _validate_question(self, question: Dict) -> bool:
         """Validate question format"""
+        # Model output is untrusted: a section may hold numbers or strings instead of objects
+        if not isinstance(question, dict):
+            return False
+        
         required_fields = ['question', 'options', 'correct_answer', 'explanation']
         
         if not all(field in question for field in required_fields):
             return False
         
+        if not isinstance(question['question'], str) or not question['question'].strip():
+            return False
+        
+        if not isinstance(question['explanation'], str):
+            return False
+        
         if not isinstance(question['options'], list) or len(question['options']) != 4:
             return False
         
-        if not isinstance(question['correct_answer'], int) or question['correct_answer'] not in [0, 1, 2, 3]:
+        if not all(isinstance(option, str) for option in question['options']):
+            return False
+        
+        if (not isinstance(question['correct_answer'], int) or isinstance(question['correct_answer'], bool)
+                or question['correct_answer'] not in [0, 1, 2, 3]):
             return False
         
         return True
 
     def _get_enhanced_mock_questions(self, topic: str, difficulty: str, num_questions: int) -> List[Dict]:
         """Enhanced mock questions with better variety and quality"""
-        
-        mock_questions = {
-            "Mathematics": {
-                "easy": [
-                    {
-                        "question": "What is 15 + 27?",
-                        "options": ["40", "42", "44", "46"],
-                        "correct_answer": 1,
-                        "explanation": "15 + 27 = 42. This is basic addition."
-                    },
-                    {
-                        "question": "What is 8 × 7?",
-                        "options": ["54", "56", "58", "60"],
-                        "correct_answer": 1,
-                        "explanation": "8 × 7 = 56. This is a basic multiplication fact."
-                    },
-                    {
-                        "question": "What is 100 ÷ 4?",
-                        "options": ["20", "25", "30", "35"],
-                        "correct_answer": 1,
-                        "explanation": "100 ÷ 4 = 25. Division is the inverse of multiplication."
-                    },
-                    {
-                        "question": "What is the area of a rectangle with length 6 and width 4?",
-                        "options": ["20", "24", "28", "32"],
-                        "correct_answer": 1,
-                        "explanation": "Area = length × width = 6 × 4 = 24 square units."
-                    },
-                    {
-                        "question": "What is 50% of 80?",
-                        "options": ["30", "35", "40", "45"],
-                        "correct_answer": 2,
-                        "explanation": "50% of 80 = 0.5 × 80 = 40."
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "What is the derivative of x²?",
-                        "options": ["2x", "x²", "2", "x"],
-                        "correct_answer": 0,
-                        "explanation": "Using the power rule: d/dx(x²) = 2x¹ = 2x"
-                    },
-                    {
-                        "question": "What is the integral of 2x dx?",
-                        "options": ["x²", "x² + C", "2", "2x + C"],
-                        "correct_answer": 1,
-                        "explanation": "∫2x dx = x² + C, where C is the constant of integration"
-                    },
-                    {
-                        "question": "What is the value of sin(π/2)?",
-                        "options": ["0", "1", "-1", "π/2"],
-                        "correct_answer": 1,
-                        "explanation": "sin(π/2) = sin(90°) = 1"
-                    },
-                    {
-                        "question": "Solve for x: 2x + 5 = 13",
-                        "options": ["x = 4", "x = 6", "x = 8", "x = 9"],
-                        "correct_answer": 0,
-                        "explanation": "2x = 13 - 5 = 8, so x = 4"
-                    },
-                    {
-                        "question": "What is the area of a circle with radius 3?",
-                        "options": ["6π", "9π", "12π", "18π"],
-                        "correct_answer": 1,
-                        "explanation": "Area = πr² = π(3)² = 9π"
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the limit of (sin x)/x as x approaches 0?",
-                        "options": ["0", "1", "∞", "undefined"],
-                        "correct_answer": 1,
-                        "explanation": "This is a fundamental limit: lim(x→0) (sin x)/x = 1"
-                    },
-                    {
-                        "question": "What is the Taylor series expansion of e^x around x = 0?",
-                        "options": ["1 + x + x²/2! + x³/3! + ...", "x + x²/2 + x³/3 + ...", "1 + x + x² + x³ + ...", "x + x² + x³ + ..."],
-                        "correct_answer": 0,
-                        "explanation": "The Taylor series for e^x is: e^x = Σ(x^n/n!) = 1 + x + x²/2! + x³/3! + ..."
-                    },
-                    {
-                        "question": "What is the eigenvalue equation for a matrix A?",
-                        "options": ["Av = λv", "A + v = λv", "Av = v + λ", "A - v = λ"],
-                        "correct_answer": 0,
-                        "explanation": "The eigenvalue equation is Av = λv, where λ is the eigenvalue and v is the eigenvector"
-                    }
-                ]
-            },
-            "Physics": {
-                "easy": [
-                    {
-                        "question": "What is the unit of force?",
-                        "options": ["Joule", "Newton", "Watt", "Pascal"],
-                        "correct_answer": 1,
-                        "explanation": "The Newton (N) is the SI unit of force, named after Isaac Newton."
-                    },
-                    {
-                        "question": "What is the speed of light in vacuum?",
-                        "options": ["3 × 10⁸ m/s", "3 × 10⁶ m/s", "3 × 10¹⁰ m/s", "3 × 10⁴ m/s"],
-                        "correct_answer": 0,
-                        "explanation": "The speed of light in vacuum is approximately 3 × 10⁸ meters per second"
-                    },
-                    {
-                        "question": "What happens to an object in free fall (ignoring air resistance)?",
-                        "options": ["It accelerates upward", "It moves at constant speed", "It accelerates downward", "It decelerates"],
-                        "correct_answer": 2,
-                        "explanation": "Objects in free fall accelerate downward due to gravity at approximately 9.8 m/s²"
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "What is Newton's second law of motion?",
-                        "options": ["F = ma", "E = mc²", "v = u + at", "s = ut + ½at²"],
-                        "correct_answer": 0,
-                        "explanation": "Newton's second law states that Force equals mass times acceleration"
-                    },
-                    {
-                        "question": "What is the unit of electric current?",
-                        "options": ["Volt", "Ampere", "Ohm", "Watt"],
-                        "correct_answer": 1,
-                        "explanation": "The ampere (A) is the SI unit of electric current"
-                    },
-                    {
-                        "question": "What happens to kinetic energy when velocity doubles?",
-                        "options": ["Doubles", "Triples", "Quadruples", "Remains same"],
-                        "correct_answer": 2,
-                        "explanation": "KE = ½mv², so when v doubles, KE increases by a factor of 4"
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the Schrödinger equation in quantum mechanics?",
-                        "options": ["iℏ ∂ψ/∂t = Ĥψ", "E = mc²", "F = ma", "∇²φ = 0"],
-                        "correct_answer": 0,
-                        "explanation": "The time-dependent Schrödinger equation is iℏ ∂ψ/∂t = Ĥψ, where ψ is the wave function"
-                    },
-                    {
-                        "question": "What is the uncertainty principle?",
-                        "options": ["ΔxΔp ≥ ℏ/2", "E = hf", "λ = h/p", "F = qE"],
-                        "correct_answer": 0,
-                        "explanation": "Heisenberg's uncertainty principle states that ΔxΔp ≥ ℏ/2, where Δx and Δp are uncertainties in position and momentum"
-                    }
-                ]
-            },
-            "Chemistry": {
-                "easy": [
-                    {
-                        "question": "What is the chemical formula for water?",
-                        "options": ["H₂O", "CO₂", "NaCl", "O₂"],
-                        "correct_answer": 0,
-                        "explanation": "Water consists of two hydrogen atoms bonded to one oxygen atom"
-                    },
-                    {
-                        "question": "What is the atomic number of carbon?",
-                        "options": ["6", "12", "14", "8"],
-                        "correct_answer": 0,
-                        "explanation": "Carbon has 6 protons, giving it an atomic number of 6"
-                    },
-                    {
-                        "question": "What is the pH of pure water?",
-                        "options": ["0", "7", "14", "1"],
-                        "correct_answer": 1,
-                        "explanation": "Pure water has a neutral pH of 7"
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "What type of bond forms between Na and Cl?",
-                        "options": ["Covalent", "Ionic", "Metallic", "Hydrogen"],
-                        "correct_answer": 1,
-                        "explanation": "Sodium and chlorine form an ionic bond due to electron transfer"
-                    },
-                    {
-                        "question": "What is Avogadro's number?",
-                        "options": ["6.02 × 10²³", "3.14 × 10⁸", "9.81 × 10²", "1.38 × 10²³"],
-                        "correct_answer": 0,
-                        "explanation": "Avogadro's number is approximately 6.02 × 10²³ particles per mole"
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the molecular orbital theory?",
-                        "options": ["Electrons occupy molecular orbitals formed by combining atomic orbitals", "Atoms share electrons equally", "Electrons transfer completely", "Atoms form ionic bonds"],
-                        "correct_answer": 0,
-                        "explanation": "Molecular orbital theory describes how atomic orbitals combine to form molecular orbitals that can hold electrons"
-                    }
-                ]
-            },
-            "Biology": {
-                "easy": [
-                    {
-                        "question": "What is the powerhouse of the cell?",
-                        "options": ["Nucleus", "Mitochondria", "Ribosome", "Golgi apparatus"],
-                        "correct_answer": 1,
-                        "explanation": "Mitochondria produce ATP, the cell's energy currency"
-                    },
-                    {
-                        "question": "What is the process by which plants make food?",
-                        "options": ["Respiration", "Photosynthesis", "Digestion", "Fermentation"],
-                        "correct_answer": 1,
-                        "explanation": "Photosynthesis converts light energy into chemical energy"
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "What is DNA replication?",
-                        "options": ["Copying DNA", "Breaking down DNA", "Translating DNA", "Transcribing DNA"],
-                        "correct_answer": 0,
-                        "explanation": "DNA replication is the process of copying DNA to produce identical DNA molecules"
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the central dogma of molecular biology?",
-                        "options": ["DNA → RNA → Protein", "Protein → RNA → DNA", "RNA → DNA → Protein", "DNA → Protein → RNA"],
-                        "correct_answer": 0,
-                        "explanation": "The central dogma describes the flow of genetic information: DNA is transcribed to RNA, which is translated to protein"
-                    }
-                ]
-            },
-            "Computer Science": {
-                "easy": [
-                    {
-                        "question": "What does CPU stand for?",
-                        "options": ["Central Processing Unit", "Computer Personal Unit", "Central Program Unit", "Computer Processing Unit"],
-                        "correct_answer": 0,
-                        "explanation": "CPU stands for Central Processing Unit, the brain of the computer"
-                    },
-                    {
-                        "question": "What is binary code?",
-                        "options": ["Code using 0s and 1s", "Code using letters", "Code using numbers 0-9", "Code using symbols"],
-                        "correct_answer": 0,
-                        "explanation": "Binary code uses only two digits: 0 and 1, representing off and on states"
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "Which data structure follows LIFO principle?",
-                        "options": ["Queue", "Stack", "Array", "Linked List"],
-                        "correct_answer": 1,
-                        "explanation": "Stack follows Last In, First Out (LIFO) principle"
-                    },
-                    {
-                        "question": "What is the time complexity of binary search?",
-                        "options": ["O(n)", "O(log n)", "O(n²)", "O(1)"],
-                        "correct_answer": 1,
-                        "explanation": "Binary search has O(log n) time complexity as it halves the search space each iteration"
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the difference between P and NP problems?",
-                        "options": ["P problems can be solved in polynomial time, NP problems can be verified in polynomial time", "P problems are harder than NP", "NP problems are easier than P", "There is no difference"],
-                        "correct_answer": 0,
-                        "explanation": "P problems can be solved in polynomial time, while NP problems can be verified (but not necessarily solved) in polynomial time"
-                    }
-                ]
-            }
-        }
-        
-        # Get questions for the topic and difficulty
-        topic_questions = mock_questions.get(topic, mock_questions["Mathematics"])
-        difficulty_questions = topic_questions.get(difficulty, topic_questions.get("medium", []))
-        
-        # If we don't have enough questions, cycle through them
-        questions = []
-        for i in range(num_questions):
-            if difficulty_questions:
-                base_question = difficulty_questions[i % len(difficulty_questions)]
-                question = base_question.copy()
-                if i >= len(difficulty_questions):
-                    question["question"] = f"{question['question']} (Variation {i // len(difficulty_questions) + 1})"
-                questions.append(question)
-        
-        return questions
+        return sample_mock_questions(topic, difficulty, num_questions)
+
+_watsonx_service: Optional[WatsonxService] = None
+_service_lock = threading.Lock()
+
+def watsonx_configured() -> bool:
+    """Whether credentials for the real model are present, without constructing the service"""
+    return bool(os.getenv("WATSONX_APIKEY") and os.getenv("WATSONX_PROJECT_ID"))
+
+def get_watsonx_service() -> WatsonxService:
+    """Return the shared service, constructing it on first use"""
+    global _watsonx_service
+    if _watsonx_service is None:
+        with _service_lock:
+            if _watsonx_service is None:
+                _watsonx_service = WatsonxService()
+    return _watsonx_service
+
+def shutdown_watsonx_service():
+    """Release the shared service's worker pools if it was ever constructed"""
+    if _watsonx_service is not None:
+        _watsonx_service.shutdown()
 
-# Global instance
-watsonx_service = WatsonxService()
\ No newline at end of file
+def __getattr__(name: str):
+    # Keeps `from ... import watsonx_service` working without an import-time construction
+    if name == "watsonx_service":
+        return get_watsonx_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,134 @@
+import queue
+import random
+import threading
+import time
+import logging
+from typing import Callable, Dict, Generic, List, TypeVar
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+QUEUE_DEPTH = REGISTRY.gauge("write_behind_queue_depth", "Items waiting in a write-behind queue", ["queue"])
+FLUSH_SECONDS = REGISTRY.histogram(
+    "write_behind_flush_seconds", "Time to write one batch, retries included", ["queue", "outcome"])
+ITEMS = REGISTRY.counter(
+    "write_behind_items", "Items leaving a write-behind queue, by how they left", ["queue", "outcome"])
+RETRIES = REGISTRY.counter("write_behind_retries", "Batch writes retried after an error", ["queue"])
+
+class WriteBehindQueue(Generic[T]):
+    """Buffer items and write them in batches on a background thread, by size or age
+
+    The buffer is bounded. When it is full, put() waits up to put_timeout for room and
+    then writes the item itself, so producers slow down instead of memory growing or
+    records being dropped. A failed batch is retried with exponential backoff and
+    dropped (and counted) only after max_retries attempts.
+    """
+
+    def __init__(self, name: str, write_batch: Callable[[List[T]], None], max_batch: int = 100,
+                 max_delay: float = 0.5, capacity: int = 10000, put_timeout: float = 1.0,
+                 max_retries: int = 5, backoff_seconds: float = 0.5, max_backoff_seconds: float = 30.0):
+        self.name = name
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._items: "queue.Queue[T]" = queue.Queue(maxsize=capacity)
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name=f"write-behind-{name}", daemon=True)
+        self._flusher.start()
+        QUEUE_DEPTH.set_function(self._items.qsize, name)
+
+    def put(self, item: T):
+        """Queue one item, writing it inline if the buffer stays full for put_timeout"""
+        if self._stop.is_set():
+            self._write([item])
+            return
+        try:
+            self._items.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning(f"Write-behind queue {self.name} is full, writing inline")
+            self._write([item], "inline")
+
+    def put_many(self, items: List[T]):
+        for item in items:
+            self.put(item)
+
+    def depth(self) -> int:
+        return self._items.qsize()
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting work and flush what is buffered"""
+        self._stop.set()
+        self._flusher.join(timeout=timeout)
+        if self._flusher.is_alive():
+            logger.warning(f"Write-behind queue {self.name} still flushing after {timeout}s, "
+                           f"{self._items.qsize()} items may be lost")
+            return
+        # Anything a producer queued while the flusher was exiting
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._items.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(leftover), self.max_batch):
+            self._write(leftover[start:start + self.max_batch])
+
+    def stats(self) -> Dict:
+        return {"depth": self._items.qsize(), "capacity": self._items.maxsize, "running": self._flusher.is_alive()}
+
+    def _next_batch(self) -> List[T]:
+        """Block for a first item, then gather more until the batch is full or max_delay has passed"""
+        try:
+            batch = [self._items.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            # Shutting down: take what is there without waiting out the delay
+            if remaining <= 0 or self._stop.is_set():
+                try:
+                    batch.append(self._items.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._items.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush_loop(self):
+        while not (self._stop.is_set() and self._items.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[T], outcome: str = "flushed"):
+        started = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    FLUSH_SECONDS.labels(self.name, "error").observe(time.monotonic() - started)
+                    ITEMS.labels(self.name, "dropped").inc(len(batch))
+                    logger.error(f"Write-behind queue {self.name} dropped {len(batch)} items after "
+                                 f"{attempt + 1} attempts: {e}")
+                    return
+                RETRIES.labels(self.name).inc()
+                # Full jitter, so workers retrying against the same outage spread out
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt)
+                time.sleep(random.uniform(0, delay))
+            else:
+                FLUSH_SECONDS.labels(self.name, "ok").observe(time.monotonic() - started)
+                ITEMS.labels(self.name, outcome).inc(len(batch))
+                return
@@ -129,6 +129,50 @@ def generate_quiz(topic, difficulty, num_questions):
         st.error(f"Error connecting to backend: {e}")
         return None
 
+def generate_quiz_stream(topic, difficulty, num_questions, on_question=None):
+    """Generate quiz via the streaming backend API, reporting each question as it arrives"""
+    try:
+        headers = {"Authorization": f"Bearer {st.session_state.token}"}
+        with requests.post(
+            f"{BACKEND_URL}/quiz/generate/stream",
+            json={
+                "topic": topic,
+                "difficulty": difficulty,
+                "num_questions": num_questions
+            },
+            headers=headers,
+            stream=True,
+            timeout=30
+        ) as response:
+            if response.status_code != 200:
+                st.error(f"Error generating quiz: {response.text}")
+                return None
+            
+            quiz = None
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "quiz":
+                    quiz = {key: value for key, value in event.items() if key != "type"}
+                    quiz["questions"] = []
+                elif event["type"] == "question" and quiz is not None:
+                    quiz["questions"].append(event["question"])
+                    if on_question:
+                        on_question(event["question"], len(quiz["questions"]))
+                elif event["type"] == "error":
+                    st.error(f"Error generating quiz: {event['detail']}")
+                    return None
+                elif event["type"] == "done":
+                    return quiz
+            
+            st.error("Quiz generation ended unexpectedly")
+            return None
+            
+    except Exception as e:
+        st.error(f"Error connecting to backend: {e}")
+        return None
+
 def submit_quiz(quiz_id, answers, time_spent=0):
     """Submit quiz answers"""
     try:
@@ -484,8 +528,15 @@ def quiz_page():
             generate_button = st.form_submit_button("🚀 Generate Quiz", use_container_width=True)
             
             if generate_button:
+                preview = st.empty()
+                ready = []
+                
+                def show_question(question, count):
+                    ready.append(f"{count}. {question['question']}")
+                    preview.info(f"Questions ready ({count}/{num_questions}):\n\n" + "\n\n".join(ready))
+                
                 with st.spinner("Generating your personalized quiz..."):
-                    quiz_data = generate_quiz(topic, difficulty, num_questions)
+                    quiz_data = generate_quiz_stream(topic, difficulty, num_questions, on_question=show_question)
                     
                     if quiz_data:
                         st.session_state.current_quiz = quiz_data